@@ -1,9 +1,35 @@
 # PRACTICE PROJECT: Student Management System
 # A complete CRUD application demonstrating OOP, exception handling, and file I/O
 
+import asyncio
+import base64
+import csv
+import gc
 import json
+import mmap
+import os
+import random
+import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict, deque
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import permutations
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
 
 # ============================================================================
 # EXCEPTIONS
@@ -25,6 +51,13 @@ class DuplicateStudentError(StudentError):
         super().__init__(f"Student with ID {student_id} already exists")
         self.student_id = student_id
 
+class DuplicateEmailError(StudentError):
+    """Raised when an email already belongs to another student"""
+    def __init__(self, email, student_id):
+        super().__init__(f"Email {email} is already used by student {student_id}")
+        self.email = email
+        self.student_id = student_id
+
 class ValidationError(StudentError):
     """Raised for validation errors"""
     pass
@@ -33,8 +66,10 @@ class ValidationError(StudentError):
 # MODELS
 # ============================================================================
 
-class Student:
-    """Student model with validation"""
+class BaseStudent(ABC):
+    """Validation and grading rules shared by every student representation"""
+    
+    __slots__ = ()
     
     VALID_GRADES = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D', 'F']
     GRADE_POINTS = {
@@ -43,22 +78,15 @@ class Student:
         'C+': 2.3, 'C': 2.0, 'C-': 1.7,
         'D': 1.0, 'F': 0.0
     }
-    
-    def __init__(self, student_id, name, email, grades=None):
-        self._student_id = None
-        self._name = None
-        self._email = None
-        self._grades = {}
-        self._created_at = datetime.now()
-        
-        # Use setters for validation
-        self.student_id = student_id
-        self.name = name
-        self.email = email
-        
-        if grades:
-            for course, grade in grades.items():
-                self.add_grade(course, grade)
+    # Grade points in tenths, so running totals stay exact integers
+    GRADE_TENTHS = {g: round(p * 10) for g, p in GRADE_POINTS.items()}
+    # GPA range [low, high) of each status (GPAs are rounded to 2 decimals)
+    STATUS_RANGES = {
+        "Dean's List": (3.5, None),
+        "Good Standing": (2.0, 3.5),
+        "Academic Probation": (0.01, 2.0),
+        "No Grades": (0.0, 0.01),
+    }
     
     # Properties with validation
     @property
@@ -92,11 +120,27 @@ class Student:
         self._email = value.lower().strip()
     
     @property
+    @abstractmethod
+    def grades(self):
+        """Course -> grade dictionary (a copy)"""
+        pass
+    
+    @property
+    @abstractmethod
     def gpa(self):
-        if not self._grades:
+        pass
+    
+    @property
+    @abstractmethod
+    def created_at(self):
+        pass
+    
+    @staticmethod
+    def gpa_from_points(points, count):
+        """GPA for a total in tenths of a point, rounded half up to 2 decimals"""
+        if not count:
             return 0.0
-        total = sum(self.GRADE_POINTS.get(g, 0) for g in self._grades.values())
-        return round(total / len(self._grades), 2)
+        return (points * 20 + count) // (2 * count) / 100
     
     @property
     def status(self):
@@ -109,31 +153,95 @@ class Student:
             return "Academic Probation"
         return "No Grades"
     
+    @abstractmethod
+    def add_grade(self, course, grade):
+        pass
+    
+    @abstractmethod
+    def remove_grade(self, course):
+        pass
+    
+    @abstractmethod
+    def to_dict(self):
+        pass
+    
+    def __str__(self):
+        return f"[{self._student_id}] {self._name} <{self._email}> GPA: {self.gpa}"
+
+class Student(BaseStudent):
+    """Student model with validation"""
+    
+    def __init__(self, student_id, name, email, grades=None):
+        self._student_id = None
+        self._name = None
+        self._email = None
+        self._grades = {}
+        self._points = 0  # Running total of GRADE_TENTHS over all grades
+        self._created_at = datetime.now()
+        
+        # Use setters for validation
+        self.student_id = student_id
+        self.name = name
+        self.email = email
+        
+        if grades:
+            for course, grade in grades.items():
+                self.add_grade(course, grade)
+    
+    @property
+    def grades(self):
+        return dict(self._grades)
+    
+    @property
+    def gpa(self):
+        return self.gpa_from_points(self._points, len(self._grades))
+    
     def add_grade(self, course, grade):
         """Add a grade for a course"""
         grade = grade.upper()
         if grade not in self.VALID_GRADES:
             raise ValidationError(f"Invalid grade: {grade}")
+        if course in self._grades:
+            self._points -= self.GRADE_TENTHS[self._grades[course]]
         self._grades[course] = grade
+        self._points += self.GRADE_TENTHS[grade]
     
     def remove_grade(self, course):
         """Remove a grade"""
         if course in self._grades:
-            del self._grades[course]
+            self._points -= self.GRADE_TENTHS[self._grades.pop(course)]
+    
+    @property
+    def created_at(self):
+        # Trusted loads keep the ISO string until someone asks for the datetime
+        if isinstance(self._created_at, str):
+            self._created_at = datetime.fromisoformat(self._created_at)
+        return self._created_at
     
     def to_dict(self):
         """Convert to dictionary for serialization"""
+        created = self._created_at
         return {
             'student_id': self._student_id,
             'name': self._name,
             'email': self._email,
-            'grades': self._grades,
-            'created_at': self._created_at.isoformat()
+            'grades': dict(self._grades),
+            'created_at': created if isinstance(created, str) else created.isoformat()
         }
     
     @classmethod
-    def from_dict(cls, data):
-        """Create student from dictionary"""
+    def from_dict(cls, data, trusted=False):
+        """Create student from dictionary (trusted data skips validation)"""
+        if trusted:
+            student = cls.__new__(cls)
+            student._student_id = data['student_id']
+            student._name = data['name']
+            student._email = data['email']
+            student._grades = dict(data.get('grades', {}))
+            student._points = sum(cls.GRADE_TENTHS[g] for g in student._grades.values())
+            student._created_at = data.get('created_at') or datetime.now()
+            return student
+        
         student = cls(
             data['student_id'],
             data['name'],
@@ -143,9 +251,100 @@ class Student:
         if 'created_at' in data:
             student._created_at = datetime.fromisoformat(data['created_at'])
         return student
+
+class CompactStudent(BaseStudent):
+    """Memory-lean student: slots, interned course names, grades as byte codes"""
     
-    def __str__(self):
-        return f"[{self._student_id}] {self._name} <{self._email}> GPA: {self.gpa}"
+    __slots__ = ('_student_id', '_name', '_email', '_courses', '_codes', '_points', '_created')
+    
+    GRADE_CODES = {g: i for i, g in enumerate(BaseStudent.VALID_GRADES)}
+    NO_CODES = array('B')  # Shared by every student without grades - never mutated
+    
+    def __init__(self, student_id, name, email, grades=None):
+        self._student_id = None
+        self._name = None
+        self._email = None
+        self._courses = ()              # Interned course names...
+        self._codes = self.NO_CODES     # ...and their grades as VALID_GRADES indexes
+        self._points = 0
+        self._created = int(time.time())
+        
+        self.student_id = student_id
+        self.name = name
+        self.email = email
+        
+        if grades:
+            for course, grade in grades.items():
+                self.add_grade(course, grade)
+    
+    @property
+    def grades(self):
+        return {course: self.VALID_GRADES[code] for course, code in zip(self._courses, self._codes)}
+    
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self._created)
+    
+    @property
+    def gpa(self):
+        return self.gpa_from_points(self._points, len(self._codes))
+    
+    def add_grade(self, course, grade):
+        """Add a grade for a course"""
+        grade = grade.upper()
+        if grade not in self.GRADE_CODES:
+            raise ValidationError(f"Invalid grade: {grade}")
+        code = self.GRADE_CODES[grade]
+        if course in self._courses:
+            i = self._courses.index(course)
+            self._points -= self.GRADE_TENTHS[self.VALID_GRADES[self._codes[i]]]
+            self._codes[i] = code
+        else:
+            self._courses += (sys.intern(course),)
+            self._codes = self._codes + array('B', (code,))
+        self._points += self.GRADE_TENTHS[grade]
+    
+    def remove_grade(self, course):
+        """Remove a grade"""
+        if course in self._courses:
+            i = self._courses.index(course)
+            self._points -= self.GRADE_TENTHS[self.VALID_GRADES[self._codes[i]]]
+            self._courses = self._courses[:i] + self._courses[i + 1:]
+            self._codes = self._codes[:i] + self._codes[i + 1:]
+    
+    def to_dict(self):
+        """Convert to dictionary for serialization"""
+        return {
+            'student_id': self._student_id,
+            'name': self._name,
+            'email': self._email,
+            'grades': self.grades,
+            'created_at': datetime.fromtimestamp(self._created).isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data, trusted=False):
+        """Create student from dictionary (trusted data skips validation)"""
+        if trusted:
+            student = cls.__new__(cls)
+            student._student_id = data['student_id']
+            student._name = data['name']
+            student._email = data['email']
+            grades = data.get('grades', {})
+            student._courses = tuple(sys.intern(course) for course in grades)
+            student._codes = array('B', (cls.GRADE_CODES[g] for g in grades.values())) if grades else cls.NO_CODES
+            student._points = sum(cls.GRADE_TENTHS[g] for g in grades.values())
+            student._created = int(time.time())
+        else:
+            student = cls(
+                data['student_id'],
+                data['name'],
+                data['email'],
+                data.get('grades', {})
+            )
+        if 'created_at' in data:
+            student._created = int(datetime.fromisoformat(data['created_at']).timestamp())
+        return student
 
 # ============================================================================
 # STORAGE
@@ -161,6 +360,31 @@ class Storage(ABC):
     @abstractmethod
     def load(self):
         pass
+    
+    def iter_records(self):
+        """Yield (student_id, record) pairs (default: load everything first)"""
+        yield from self.load().items()
+    
+    def lazy_records(self):
+        """{student_id: record} for a roster that hydrates students on first use"""
+        records = {}
+        try:
+            for sid, record in self.iter_records():
+                records[sid.upper()] = record
+        except json.JSONDecodeError as e:
+            print(f"Warning: Stopped loading at a corrupt record: {e}")
+        return records
+    
+    def save_changes(self, changed, removed, all_records):
+        """Persist changed records and removed IDs (default: rewrite everything)
+        
+        all_records() yields (student_id, record) pairs for the whole roster.
+        """
+        self.save(dict(all_records()))
+    
+    def close(self):
+        """Release any open resources"""
+        pass
 
 class MemoryStorage(Storage):
     """In-memory storage (for testing)"""
@@ -175,14 +399,50 @@ class MemoryStorage(Storage):
         return self._data
 
 class JSONStorage(Storage):
-    """JSON file storage"""
+    """JSON file storage.
+    
+    Each student's encoded text is cached, so saving a few changes re-encodes
+    only those students and splices the file together from the cache.
+    """
     
-    def __init__(self, filename='students.json'):
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')  # What a cut-off number may still need
+    
+    def __init__(self, filename='students.json', chunk_size=64 * 1024):
         self.filename = filename
+        self.chunk_size = chunk_size
+        self._fragments = None  # student_id -> b'  "ID": {...}' as it appears in the file
+    
+    @staticmethod
+    def _fragment(student_id, record):
+        # Same text json.dump(data, f, indent=2) writes for this entry, kept as
+        # bytes so unchanged entries aren't re-encoded on every save
+        text = f"  {json.dumps(student_id)}: " + json.dumps(record, indent=2).replace('\n', '\n  ')
+        return text.encode('utf-8')
+    
+    def _write_fragments(self):
+        with open(self.filename, 'wb') as f:
+            if self._fragments:
+                f.write(b'{\n')
+                f.write(b',\n'.join(self._fragments.values()))
+                f.write(b'\n}')
+            else:
+                f.write(b'{}')
     
     def save(self, data):
-        with open(self.filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        self._fragments = {sid: self._fragment(sid, record) for sid, record in data.items()}
+        self._write_fragments()
+    
+    def save_changes(self, changed, removed, all_records):
+        if self._fragments is None:
+            # First save since loading - encode everyone once
+            self.save(dict(all_records()))
+            return
+        for sid in removed:
+            self._fragments.pop(sid, None)
+        for sid, record in changed.items():
+            self._fragments[sid] = self._fragment(sid, record)
+        self._write_fragments()
     
     def load(self):
         try:
@@ -192,32 +452,1316 @@ class JSONStorage(Storage):
             return {}
         except json.JSONDecodeError:
             return {}
+    
+    def iter_records(self):
+        """Stream (student_id, record) pairs, holding about one record in memory"""
+        try:
+            f = open(self.filename, 'r')
+        except FileNotFoundError:
+            return
+        with f:
+            yield from self._iter_object(f)
+    
+    def _iter_object(self, f):
+        """Yield the key/value pairs of the top-level JSON object in f"""
+        decoder = json.JSONDecoder()
+        buf, pos, eof = '', 0, False
+        expect = '{'  # Next token: '{', 'key', 'first key', ':', 'value' or ','
+        
+        while True:
+            pos = self.WHITESPACE.match(buf, pos).end()
+            need_more = pos == len(buf)
+            if not need_more and expect in ('key', 'first key', 'value'):
+                if expect == 'first key' and buf[pos] == '}':
+                    return
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A value touching the end of the buffer might continue in the
+                    # next chunk, and a number cut at "1e" or "3." decodes short
+                    need_more = not eof and (
+                        end == len(buf) or
+                        type(value) in (int, float) and self.NUMBER_TAIL.match(buf, end) is not None)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    need_more = True
+                
+                if not need_more:
+                    if expect == 'value':
+                        yield key, value
+                        expect = ','
+                    elif isinstance(value, str):
+                        key = value
+                        expect = ':'
+                    else:
+                        raise json.JSONDecodeError("Expecting property name", buf, pos)
+                    pos = end
+            elif not need_more:
+                char = buf[pos]
+                if expect == '{' and char == '{':
+                    expect = 'first key'
+                elif expect == ':' and char == ':':
+                    expect = 'value'
+                elif expect == ',' and char == ',':
+                    expect = 'key'
+                elif expect == ',' and char == '}':
+                    return
+                else:
+                    raise json.JSONDecodeError(f"Expecting {expect!r}", buf, pos)
+                pos += 1
+            
+            if need_more:
+                if eof:
+                    raise json.JSONDecodeError("Unexpected end of file", buf, pos)
+                chunk = f.read(self.chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+
+class JournalStorage(Storage):
+    """Append-only journal: one compact line per change, compacted in the background
+    
+    Compaction starts once the journal is past compact_threshold and has grown
+    to COMPACT_GROWTH times its size after the last compaction, so a roster
+    bigger than the threshold isn't rewritten on every append.
+    """
+    
+    COMPACT_GROWTH = 2
+    
+    def __init__(self, filename='students.journal', compact_threshold=4 * 1024 * 1024):
+        self.filename = filename
+        self.compact_threshold = compact_threshold
+        self._compacted_size = 0  # Journal size right after the last compaction
+        self._file = None
+        self._lock = threading.Lock()
+        self._compactor = None
+    
+    @staticmethod
+    def _encode(op, student_id, record=None):
+        entry = [op, student_id, record] if record is not None else [op, student_id]
+        return (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+    
+    def _append(self, lines):
+        """Append encoded lines and start compaction if the journal got too big"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.filename, 'ab')
+            self._file.write(b''.join(lines))
+            self._file.flush()
+            size = self._file.tell()
+        
+        limit = max(self.compact_threshold, self.COMPACT_GROWTH * self._compacted_size)
+        if size > limit and not self.compacting:
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+    
+    @property
+    def compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+    
+    def save(self, data):
+        """Replace the journal with one entry per student"""
+        self.close()
+        with self._lock:
+            self._write_snapshot(data, self.filename)
+            self._compacted_size = os.path.getsize(self.filename)
+    
+    def save_changes(self, changed, removed, all_records):
+        lines = [self._encode('put', sid, record) for sid, record in changed.items()]
+        lines += [self._encode('del', sid) for sid in removed]
+        if lines:
+            self._append(lines)
+    
+    def load(self):
+        with self._lock:
+            return self._replay()
+    
+    def _replay(self, end=None):
+        """Rebuild the roster by replaying the journal (up to byte offset `end`)"""
+        data = {}
+        try:
+            with open(self.filename, 'rb') as f:
+                position = 0
+                for line in f:
+                    position += len(line)
+                    if end is not None and position > end:
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn write from a crash - skip it
+                    if entry[0] == 'put':
+                        data[entry[1]] = entry[2]
+                    else:
+                        data.pop(entry[1], None)
+        except FileNotFoundError:
+            pass
+        return data
+    
+    def _write_snapshot(self, data, filename):
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            for sid, record in data.items():
+                f.write(self._encode('put', sid, record))
+        os.replace(tmp, filename)
+    
+    def compact(self):
+        """Rewrite the journal so it holds only the latest state of each student"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            try:
+                end = os.path.getsize(self.filename)
+            except FileNotFoundError:
+                return
+        
+        # The expensive part runs without the lock so appends can continue
+        data = self._replay(end)
+        tmp = self.filename + '.compact'
+        with open(tmp, 'wb') as f:
+            for sid, record in data.items():
+                f.write(self._encode('put', sid, record))
+        
+        with self._lock:
+            # Copy anything appended while we were compacting
+            with open(self.filename, 'rb') as src, open(tmp, 'ab') as dst:
+                src.seek(end)
+                dst.write(src.read())
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp, self.filename)
+            self._compacted_size = os.path.getsize(self.filename)
+    
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def _load_shard(filename):
+    """Load one shard file (runs in a worker process)"""
+    return JSONStorage(filename).load()
+
+class ShardedStorage(Storage):
+    """Students split across several JSON files by a hash of their ID"""
+    
+    def __init__(self, directory='students_shards', shards=8, workers=None):
+        self.directory = directory
+        self.workers = workers or os.cpu_count()
+        os.makedirs(directory, exist_ok=True)
+        self.filenames = [os.path.join(directory, f"shard_{i:03d}.json") for i in range(shards)]
+        self._shards = [{} for _ in range(shards)]
+        self._stale = False  # Shard files on disk don't match the shard count
+    
+    def shard_of(self, student_id):
+        # crc32 is stable across runs, unlike hash() on strings
+        return zlib.crc32(student_id.encode('utf-8')) % len(self._shards)
+    
+    def _write(self, indexes):
+        for i in indexes:
+            JSONStorage(self.filenames[i]).save(self._shards[i])
+    
+    def save(self, data):
+        self._shards = [{} for _ in self._shards]
+        for sid, record in data.items():
+            self._shards[self.shard_of(sid)][sid] = record
+        self._write(range(len(self._shards)))
+        
+        # Remove files left over from a different shard count
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('shard_') and path not in self.filenames:
+                os.remove(path)
+        self._stale = False
+    
+    def save_changes(self, changed, removed, all_records):
+        if self._stale:
+            self.save(dict(all_records()))
+            return
+        
+        dirty = set()
+        for sid, record in changed.items():
+            i = self.shard_of(sid)
+            self._shards[i][sid] = record
+            dirty.add(i)
+        for sid in removed:
+            i = self.shard_of(sid)
+            self._shards[i].pop(sid, None)
+            dirty.add(i)
+        self._write(sorted(dirty))
+    
+    def load(self):
+        files = sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                       if name.startswith('shard_') and name.endswith('.json'))
+        self._stale = files != [f for f in self.filenames if os.path.exists(f)]
+        
+        if self.workers > 1 and len(files) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(files))) as pool:
+                parts = list(pool.map(_load_shard, files))
+        else:
+            parts = [_load_shard(f) for f in files]
+        
+        data = {}
+        self._shards = [{} for _ in self._shards]
+        for part in parts:
+            for sid, record in part.items():
+                data[sid] = record
+                self._shards[self.shard_of(sid)][sid] = record
+        return data
+
+class SnapshotStorage(Storage):
+    """Binary snapshot: fixed header, struct-packed records, then an offset table
+    sorted by student ID, so one student can be read without parsing the rest.
+    
+    Layout: HEADER | record ... | (student ID padded to key width, offset) ...
+    """
+    
+    MAGIC = b'STUSNAP1'
+    HEADER = struct.Struct('<8sIIQ')  # magic, student count, key width, table offset
+    RECORD = struct.Struct('<HHHH')  # name, email and created_at lengths, grade count
+    GRADE = struct.Struct('<HB')  # course and grade lengths
+    
+    def __init__(self, filename='students.snap'):
+        self.filename = filename
+        self._view = None
+    
+    @classmethod
+    def _encode(cls, record):
+        name, email, created = (str(record[k]).encode('utf-8') for k in ('name', 'email', 'created_at'))
+        parts = [cls.RECORD.pack(len(name), len(email), len(created), len(record['grades'])),
+                 name, email, created]
+        for course, grade in record['grades'].items():
+            course, grade = course.encode('utf-8'), grade.encode('utf-8')
+            parts += [cls.GRADE.pack(len(course), len(grade)), course, grade]
+        return b''.join(parts)
+    
+    def save(self, data):
+        keys = sorted((sid.encode('utf-8'), sid) for sid in data)
+        width = max((len(key) for key, _ in keys), default=1)
+        entry = struct.Struct(f'<{width}sQ')
+        
+        records, table = [], []
+        offset = self.HEADER.size
+        for key, sid in keys:
+            record = self._encode(data[sid])
+            records.append(record)
+            table.append(entry.pack(key, offset))
+            offset += len(record)
+        
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(keys), width, offset))
+            f.write(b''.join(records))
+            f.write(b''.join(table))
+        # Windows can't replace a file that is mapped, so let go of the view first
+        if self._view is not None:
+            self._view.release()
+        try:
+            os.replace(tmp, self.filename)
+        finally:
+            if self._view is not None:
+                self._view.reopen()
+    
+    def load(self):
+        return dict(self.iter_records())
+    
+    def iter_records(self):
+        try:
+            snapshot = SnapshotFile(self.filename)
+        except FileNotFoundError:
+            return
+        try:
+            yield from snapshot.items()
+        finally:
+            snapshot.close()
+    
+    def lazy_records(self):
+        """The snapshot mapped into memory; records are decoded as they are used"""
+        if self._view is None:
+            try:
+                self._view = SnapshotFile(self.filename)
+            except FileNotFoundError:
+                return {}
+        return self._view
+    
+    def close(self):
+        if self._view is not None:
+            self._view.close()
+            self._view = None
+
+class SnapshotFile(Mapping):
+    """Read-only {student_id: record} view of a mmapped SnapshotStorage file.
+    
+    Lookups binary-search the offset table and decode just that record.
+    pop() hides a record from the view without touching the file, which is
+    all LazyStudents needs from its record mapping.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self._popped = set()
+        self._map()
+    
+    def _map(self):
+        with open(self.filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._width, self._table = SnapshotStorage.HEADER.unpack_from(self._mm)
+        if magic != SnapshotStorage.MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.filename} is not a student snapshot")
+        self._entry = struct.Struct(f'<{self._width}sQ')
+    
+    def _key(self, i):
+        start = self._table + i * self._entry.size
+        return self._mm[start:start + self._width]
+    
+    def _offset(self, student_id):
+        """Offset of a student's record, or None"""
+        key = student_id.encode('utf-8')
+        if len(key) > self._width:
+            return None
+        key = key.ljust(self._width, b'\0')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count or self._key(lo) != key:
+            return None
+        return self._entry.unpack_from(self._mm, self._table + lo * self._entry.size)[1]
+    
+    def _decode(self, student_id, offset):
+        mm = self._mm
+        name_len, email_len, created_len, count = SnapshotStorage.RECORD.unpack_from(mm, offset)
+        pos = offset + SnapshotStorage.RECORD.size
+        name = mm[pos:pos + name_len].decode('utf-8')
+        pos += name_len
+        email = mm[pos:pos + email_len].decode('utf-8')
+        pos += email_len
+        created_at = mm[pos:pos + created_len].decode('utf-8')
+        pos += created_len
+        
+        grades = {}
+        for _ in range(count):
+            course_len, grade_len = SnapshotStorage.GRADE.unpack_from(mm, pos)
+            pos += SnapshotStorage.GRADE.size
+            course = mm[pos:pos + course_len].decode('utf-8')
+            pos += course_len
+            grades[course] = mm[pos:pos + grade_len].decode('utf-8')
+            pos += grade_len
+        return {'student_id': student_id, 'name': name, 'email': email,
+                'grades': grades, 'created_at': created_at}
+    
+    def __getitem__(self, student_id):
+        offset = None if student_id in self._popped else self._offset(student_id)
+        if offset is None:
+            raise KeyError(student_id)
+        return self._decode(student_id, offset)
+    
+    def _file_ids(self):
+        """Every student ID in the file, popped or not"""
+        for i in range(self._count):
+            yield self._key(i).rstrip(b'\0').decode('utf-8')
+    
+    def __iter__(self):
+        for sid in self._file_ids():
+            if sid not in self._popped:
+                yield sid
+    
+    def __len__(self):
+        return self._count - len(self._popped)
+    
+    def items(self):
+        """Iterate (student_id, record) pairs in file order, without lookups"""
+        for i in range(self._count):
+            key, offset = self._entry.unpack_from(self._mm, self._table + i * self._entry.size)
+            sid = key.rstrip(b'\0').decode('utf-8')
+            if sid not in self._popped:
+                yield sid, self._decode(sid, offset)
+    
+    def pop(self, student_id, default=None):
+        try:
+            record = self[student_id]
+        except KeyError:
+            return default
+        self._popped.add(student_id)
+        return record
+    
+    def close(self):
+        self._mm.close()
+    
+    def release(self):
+        """Unmap the file so it can be replaced, remembering which records are visible"""
+        self._visible = set(self)
+        self._mm.close()
+    
+    def reopen(self):
+        """Map the file again after release(). Only records visible before
+        stay visible: the rest of the new file (students hydrated or added
+        since) is already held in memory by the roster."""
+        self._map()
+        self._popped = {sid for sid in self._file_ids() if sid not in self._visible}
+        self._visible = None
+
+class QueryableStorage(Storage):
+    """Storage that can answer lookups itself instead of loading everything"""
+    
+    @abstractmethod
+    def get(self, student_id):
+        """Return one record, or None"""
+        pass
+    
+    @abstractmethod
+    def ids(self):
+        """Iterate over all stored student IDs"""
+        pass
+    
+    @abstractmethod
+    def search(self, query):
+        """Records whose lowercase name or email contains query"""
+        pass
+    
+    @abstractmethod
+    def by_gpa(self, min_gpa, max_gpa=None):
+        """Records with min_gpa <= GPA < max_gpa"""
+        pass
+    
+    @abstractmethod
+    def by_email(self, email):
+        """Records with exactly this (normalized) email"""
+        pass
+    
+    @abstractmethod
+    def grade_counts(self, course):
+        """{grade: number of students} for one course"""
+        pass
+    
+    @abstractmethod
+    def courses(self):
+        """Sorted names of every course with at least one grade"""
+        pass
+    
+    @abstractmethod
+    def ordered(self, by, start=None, limit=None, after=None):
+        """Up to limit records by name (A-Z) or GPA (highest first), from start on,
+        or after the (value, student_id) of the last record already seen"""
+        pass
+
+class SQLiteStorage(QueryableStorage):
+    """SQLite database storage with indexed student and grade tables"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            student_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            gpa REAL NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_students_gpa ON students (gpa DESC, student_id);
+        CREATE INDEX IF NOT EXISTS idx_students_name ON students (name, student_id);
+        CREATE INDEX IF NOT EXISTS idx_students_email ON students (email);
+        CREATE TABLE IF NOT EXISTS grades (
+            student_id TEXT NOT NULL,
+            course TEXT NOT NULL,
+            grade TEXT NOT NULL,
+            PRIMARY KEY (student_id, course)
+        );
+        CREATE INDEX IF NOT EXISTS idx_grades_course ON grades (course);
+    """
+    
+    def __init__(self, filename='students.db'):
+        self.filename = filename
+        # One connection shared by all threads, used under a lock
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        # SQLite's lower() and LIKE only fold ASCII; search must match str.lower() in memory
+        self.conn.create_function('py_lower', 1, str.lower, deterministic=True)
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _gpa(grades):
+        points = sum(Student.GRADE_TENTHS.get(g, 0) for g in grades.values())
+        return Student.gpa_from_points(points, len(grades))
+    
+    def _write(self, changed, removed):
+        rows = [(sid, r['name'], r['email'], self._gpa(r['grades']), r['created_at'])
+                for sid, r in changed.items()]
+        grade_rows = [(sid, course, grade)
+                      for sid, r in changed.items() for course, grade in r['grades'].items()]
+        stale = [(sid,) for sid in changed] + [(sid,) for sid in removed]
+        
+        self.conn.executemany("DELETE FROM grades WHERE student_id = ?", stale)
+        self.conn.executemany("DELETE FROM students WHERE student_id = ?", [(sid,) for sid in removed])
+        self.conn.executemany(
+            "INSERT INTO students VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (student_id) DO UPDATE SET name = excluded.name, "
+            "email = excluded.email, gpa = excluded.gpa, created_at = excluded.created_at",
+            rows)
+        self.conn.executemany("INSERT INTO grades VALUES (?, ?, ?)", grade_rows)
+    
+    def save(self, data):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM grades")
+            self.conn.execute("DELETE FROM students")
+            self._write(data, ())
+    
+    def save_changes(self, changed, removed, all_records):
+        with self._lock, self.conn:
+            self._write(changed, removed)
+    
+    def _fetch(self, where='', params=(), order='s.rowid', limit=None):
+        """Run a students/grades join and return the rows grouped into records"""
+        source = 'students'
+        if limit is not None:
+            # Limit the students, not the joined grade rows
+            source = f"(SELECT * FROM students s {where} ORDER BY {order} LIMIT ?)"
+            where, params = '', (*params, limit)
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT s.student_id, s.name, s.email, s.created_at, g.course, g.grade "
+                f"FROM {source} s LEFT JOIN grades g ON g.student_id = s.student_id "
+                f"{where} ORDER BY {order}, g.rowid", params)
+            return list(self._group(cursor))
+    
+    @staticmethod
+    def _group(cursor):
+        record = None
+        for sid, name, email, created_at, course, grade in cursor:
+            if record is None or record['student_id'] != sid:
+                if record is not None:
+                    yield record
+                record = {'student_id': sid, 'name': name, 'email': email,
+                          'grades': {}, 'created_at': created_at}
+            if course is not None:
+                record['grades'][course] = grade
+        if record is not None:
+            yield record
+    
+    def load(self):
+        return {r['student_id']: r for r in self._fetch()}
+    
+    def iter_records(self, page_size=1000):
+        """Stream (student_id, record) pairs a page of students at a time"""
+        last = ''
+        while True:
+            records = self._fetch("WHERE s.student_id > ?", (last,), 's.student_id', page_size)
+            for record in records:
+                yield record['student_id'], record
+            if len(records) < page_size:
+                return
+            last = records[-1]['student_id']
+    
+    def get(self, student_id):
+        records = self._fetch("WHERE s.student_id = ?", (student_id,))
+        return records[0] if records else None
+    
+    def ids(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT student_id FROM students ORDER BY rowid")]
+    
+    def search(self, query):
+        return self._fetch("WHERE instr(py_lower(s.name), ?) > 0 OR instr(py_lower(s.email), ?) > 0",
+                           (query, query))
+    
+    def by_gpa(self, min_gpa, max_gpa=None):
+        if max_gpa is None:
+            return self._fetch("WHERE s.gpa >= ?", (min_gpa,))
+        return self._fetch("WHERE s.gpa >= ? AND s.gpa < ?", (min_gpa, max_gpa))
+    
+    def by_email(self, email):
+        return self._fetch("WHERE s.email = ?", (email,))
+    
+    def grade_counts(self, course):
+        with self._lock:
+            return dict(self.conn.execute(
+                "SELECT grade, COUNT(*) FROM grades WHERE course = ? GROUP BY grade", (course,)))
+    
+    def courses(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT course FROM grades ORDER BY course")]
+    
+    def ordered(self, by, start=None, limit=None, after=None):
+        column, direction, op = {'name': ('s.name', '', '>'), 'gpa': ('s.gpa', ' DESC', '<')}[by]
+        conditions, params = [], []
+        if start is not None:
+            conditions.append(f"{column} {op}= ?")
+            params.append(start)
+        if after is not None:
+            # The first test seeks the index, the second skips ties already seen
+            conditions.append(f"{column} {op}= ? AND ({column} {op} ? OR s.student_id > ?)")
+            params += [after[0], after[0], after[1]]
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return self._fetch(where, tuple(params), f"{column}{direction}, s.student_id", limit)
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+# ============================================================================
+# INDEXES
+# ============================================================================
+
+class StudentIndex(ABC):
+    """Secondary index that the manager keeps in sync with the roster"""
+    
+    @abstractmethod
+    def update(self, student):
+        """Add a student, or re-index one that changed"""
+        pass
+    
+    @abstractmethod
+    def remove(self, student_id):
+        """Drop a student from the index"""
+        pass
+    
+    def build(self, students):
+        """Index a whole roster at once"""
+        for student in students:
+            self.update(student)
+    
+    def build_records(self, records):
+        """Index raw (student_id, record) pairs instead, if this index can.
+        Returns False if it needs Student objects."""
+        return False
+
+class TrigramIndex(StudentIndex):
+    """Inverted index from 3-letter substrings of name/email to student IDs"""
+    
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._texts = {}
+    
+    @staticmethod
+    def _text(student):
+        return f"{student.name.lower()}\n{student.email.lower()}"
+    
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def update(self, student):
+        sid = student.student_id
+        text = self._text(student)
+        old = self._texts.get(sid)
+        if old == text:
+            return
+        
+        old_grams = self.trigrams(old) if old is not None else set()
+        new_grams = self.trigrams(text)
+        self._discard(sid, old_grams - new_grams)
+        for gram in new_grams - old_grams:
+            self._postings[gram].add(sid)
+        self._texts[sid] = text
+    
+    def remove(self, student_id):
+        old = self._texts.pop(student_id, None)
+        if old is not None:
+            self._discard(student_id, self.trigrams(old))
+    
+    def _discard(self, student_id, grams):
+        for gram in grams:
+            posting = self._postings[gram]
+            posting.discard(student_id)
+            if not posting:
+                del self._postings[gram]
+    
+    def search(self, query):
+        """Sorted IDs of students whose name or email contains query (lowercase)"""
+        grams = self.trigrams(query)
+        if not grams:
+            # Too short to have a trigram - check every indexed text
+            return sorted(sid for sid, text in self._texts.items() if query in text)
+        
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*postings)
+        return sorted(sid for sid in candidates if query in self._texts[sid])
+
+class StatusIndex(StudentIndex):
+    """Buckets of student IDs by academic status"""
+    
+    def __init__(self):
+        self._buckets = defaultdict(dict)  # status -> {student_id: None}
+        self._statuses = {}
+    
+    def update(self, student):
+        sid = student.student_id
+        status = student.status
+        old = self._statuses.get(sid)
+        if old == status:
+            return
+        if old is not None:
+            del self._buckets[old][sid]
+        self._buckets[status][sid] = None
+        self._statuses[sid] = status
+    
+    def remove(self, student_id):
+        old = self._statuses.pop(student_id, None)
+        if old is not None:
+            del self._buckets[old][student_id]
+    
+    def ids(self, status):
+        """IDs of students with the given status"""
+        return list(self._buckets.get(status, ()))
+
+class EmailIndex(StudentIndex):
+    """Email -> student ID, for lookups and the one-student-per-email rule"""
+    
+    def __init__(self):
+        # email -> {student_id: None}; more than one owner only for data saved before the rule
+        self._owners = defaultdict(dict)
+        self._emails = {}
+    
+    def update(self, student):
+        sid = student.student_id
+        email = student.email
+        old = self._emails.get(sid)
+        if old == email:
+            return
+        if old is not None:
+            self._drop(old, sid)
+        self._owners[email][sid] = None
+        self._emails[sid] = email
+    
+    def remove(self, student_id):
+        old = self._emails.pop(student_id, None)
+        if old is not None:
+            self._drop(old, student_id)
+    
+    def _drop(self, email, student_id):
+        owners = self._owners[email]
+        del owners[student_id]
+        if not owners:
+            del self._owners[email]
+    
+    def build_records(self, records):
+        for sid, record in records:
+            if 'email' in record:
+                email = record['email'].lower().strip()
+                self._owners[email][sid] = None
+                self._emails[sid] = email
+        return True
+    
+    def ids(self, email):
+        """IDs of students with this email"""
+        return list(self._owners.get(email, ()))
+
+class CourseStatsIndex(StudentIndex):
+    """Grade counts per course, adjusted as grades change"""
+    
+    def __init__(self):
+        self._counts = defaultdict(Counter)  # course -> Counter(grade -> students)
+        self._grades = {}  # student_id -> grades as last indexed
+    
+    def update(self, student):
+        sid = student.student_id
+        new = student.grades
+        old = self._grades.get(sid, {})
+        if new == old:
+            return
+        for course, grade in old.items():
+            if new.get(course) != grade:
+                self._drop(course, grade)
+        for course, grade in new.items():
+            if old.get(course) != grade:
+                self._counts[course][grade] += 1
+        self._grades[sid] = new
+    
+    def remove(self, student_id):
+        for course, grade in self._grades.pop(student_id, {}).items():
+            self._drop(course, grade)
+    
+    def _drop(self, course, grade):
+        counts = self._counts[course]
+        counts[grade] -= 1
+        if not counts[grade]:
+            del counts[grade]
+            if not counts:
+                del self._counts[course]
+    
+    def counts(self, course):
+        return dict(self._counts.get(course, {}))
+    
+    def courses(self):
+        return sorted(self._counts)
+
+class FuzzyNameIndex(StudentIndex):
+    """Words of student names, indexed for typo-tolerant lookup.
+    
+    Two words are within edit distance d only if deleting at most d letters
+    from each leaves a common string. So every name word is stored under each
+    of its variants with up to MAX_DISTANCE letters deleted. A query looks up
+    its own variants and measures only the few words they lead to.
+    """
+    
+    MAX_DISTANCE = 2
+    
+    def __init__(self):
+        self._names = {}  # student_id -> name words as last indexed
+        self._postings = {}  # word -> set of student IDs
+        self._variants = defaultdict(list)  # word with letters deleted -> words
+    
+    @staticmethod
+    def words(text):
+        return tuple(text.lower().split())
+    
+    @staticmethod
+    def deletions(word, depth):
+        """word plus every string made by deleting up to depth letters"""
+        found = frontier = {word}
+        for _ in range(depth):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+            found = found | frontier
+        return found
+    
+    @staticmethod
+    def distance(a, b, limit):
+        """Levenshtein distance, or something over limit once it must exceed it"""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current = [i]
+            for j, cb in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+    
+    def update(self, student):
+        sid = student.student_id
+        words = self.words(student.name)
+        old = self._names.get(sid)
+        if old == words:
+            return
+        if old is not None:
+            self.remove(sid)
+        for word in words:
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = set()
+                for variant in self.deletions(word, self.MAX_DISTANCE):
+                    self._variants[variant].append(word)
+            posting.add(sid)
+        self._names[sid] = words
+    
+    def remove(self, student_id):
+        for word in self._names.pop(student_id, ()):
+            posting = self._postings.get(word)
+            if posting is None:
+                continue  # Name repeats a word we already dropped
+            posting.discard(student_id)
+            if not posting:
+                del self._postings[word]
+                for variant in self.deletions(word, self.MAX_DISTANCE):
+                    words = self._variants[variant]
+                    words.remove(word)
+                    if not words:
+                        del self._variants[variant]
+    
+    def matches(self, word, limit):
+        """{indexed word: distance} for words within limit edits of word"""
+        candidates = set()
+        for variant in self.deletions(word, limit):
+            candidates.update(self._variants.get(variant, ()))
+        found = {}
+        for candidate in candidates:
+            d = self.distance(word, candidate, limit)
+            if d <= limit:
+                found[candidate] = d
+        return found
+    
+    def search(self, query, max_distance):
+        """(distance, student_id) pairs, closest first, for names that contain
+        every query word with at most max_distance edits in total"""
+        matches = [self.matches(word, max_distance) for word in self.words(query)]
+        if not matches or not all(matches):
+            return []
+        
+        # Each word needs at least its best distance, leaving less slack for the others
+        best = [min(m.values()) for m in matches]
+        slack = max_distance - sum(best)
+        if slack < 0:
+            return []
+        matches = [{w: d for w, d in m.items() if d - low <= slack} for m, low in zip(matches, best)]
+        
+        # Candidates come from the query word whose matches cover the fewest students
+        rarest = min(matches, key=lambda m: sum(len(self._postings[w]) for w in m))
+        candidates = set().union(*(self._postings[w] for w in rarest))
+        
+        results = []
+        for sid in candidates:
+            d = self._name_distance(self._names[sid], matches)
+            if d <= max_distance:
+                results.append((d, sid))
+        results.sort()
+        return results
+    
+    @staticmethod
+    def _name_distance(name_words, matches):
+        """Least total distance pairing each query word with a different name word"""
+        best = float('inf')
+        for chosen in permutations(name_words, len(matches)):
+            total = 0
+            for word, m in zip(chosen, matches):
+                d = m.get(word)
+                if d is None:
+                    break
+                total += d
+            else:
+                best = min(best, total)
+        return best
+
+class OrderIndex(StudentIndex):
+    """Student IDs kept sorted by a key, so ordered listings need no re-sort"""
+    
+    def __init__(self):
+        self._entries = []  # Sorted (key, student_id) pairs
+        self._keys = {}  # student_id -> key as last indexed
+    
+    @staticmethod
+    @abstractmethod
+    def key(student):
+        """Sort key for a student"""
+        pass
+    
+    @staticmethod
+    def start_key(value):
+        """Sort key of the first value a listing should start from"""
+        return value
+    
+    def build(self, students):
+        # One sort instead of an insort per student
+        self._keys = {s.student_id: self.key(s) for s in students}
+        self._entries = sorted((key, sid) for sid, key in self._keys.items())
+    
+    def update(self, student):
+        sid = student.student_id
+        key = self.key(student)
+        old = self._keys.get(sid)
+        if old == key:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (old, sid))]
+        insort(self._entries, (key, sid))
+        self._keys[sid] = key
+    
+    def remove(self, student_id):
+        old = self._keys.pop(student_id, None)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (old, student_id))]
+    
+    def ids(self, start=None, limit=None, after=None):
+        """Up to limit IDs in order, beginning at the first key >= start_key(start)
+        and after the (value, student_id) pair `after`"""
+        i = 0 if start is None else bisect_left(self._entries, (self.start_key(start),))
+        if after is not None:
+            value, sid = after
+            i = max(i, bisect_right(self._entries, (self.start_key(value), sid)))
+        end = None if limit is None else i + limit
+        return [sid for _, sid in self._entries[i:end]]
+
+class NameOrderIndex(OrderIndex):
+    """Students by name, A-Z"""
+    
+    @staticmethod
+    def key(student):
+        return student.name
+
+class GPAOrderIndex(OrderIndex):
+    """Students by GPA, highest first"""
+    
+    @staticmethod
+    def key(student):
+        return -student.gpa
+    
+    @staticmethod
+    def start_key(value):
+        return -value
+
+# ============================================================================
+# MANAGER
+# ============================================================================
+
+class StoredStudents(MutableMapping):
+    """Student mapping that hydrates records from a QueryableStorage on demand"""
+    
+    def __init__(self, storage, student_class=Student, trusted=False):
+        self.storage = storage
+        self.student_class = student_class
+        self.trusted = trusted
+        self._cache = {}
+        self._removed = set()
+        self._lock = threading.RLock()  # Readers on several threads may hydrate at once
+    
+    def _record(self, student_id):
+        return self.storage.get(student_id)
+    
+    def _ids(self):
+        return self.storage.ids()
+    
+    def hydrate(self, record):
+        """Student for a record, reusing the cached object if there is one"""
+        sid = record.get('student_id')
+        student = self._cache.get(sid)
+        if student is not None or sid in self._removed:
+            return student
+        with self._lock:
+            if sid not in self._cache:
+                try:
+                    self._cache[sid] = self.student_class.from_dict(record, trusted=self.trusted)
+                except (ValidationError, KeyError) as e:
+                    print(f"Warning: Could not load student {sid}: {e}")
+                    self._removed.add(sid)
+                    return None
+            return self._cache[sid]
+    
+    def __getitem__(self, student_id):
+        student = self._cache.get(student_id)
+        if student is None:
+            with self._lock:
+                student = self._cache.get(student_id)
+                if student is None and student_id not in self._removed:
+                    record = self._record(student_id)
+                    student = None if record is None else self.hydrate(record)
+        if student is None:
+            raise KeyError(student_id)
+        return student
+    
+    def __setitem__(self, student_id, student):
+        self._cache[student_id] = student
+        self._removed.discard(student_id)
+    
+    def __delitem__(self, student_id):
+        self[student_id]
+        del self._cache[student_id]
+        self._removed.add(student_id)
+    
+    def __iter__(self):
+        cached = list(self._cache)
+        yield from cached
+        for sid in self._ids():
+            if sid not in self._cache and sid not in self._removed:
+                yield sid
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def items(self):
+        """Iterate (student_id, student) pairs, skipping records that fail to load"""
+        for sid in self:
+            student = self.get(sid)
+            if student is not None:
+                yield sid, student
+    
+    def values(self):
+        """Iterate students, skipping records that fail to load"""
+        for _, student in self.items():
+            yield student
+    
+    def records(self):
+        """(student_id, record) pairs without hydrating anything new"""
+        cached = list(self._cache.items())
+        for sid, student in cached:
+            yield sid, student.to_dict()
+        for sid, record in self.storage.iter_records():
+            if sid not in self._cache and sid not in self._removed:
+                yield sid, record
 
-# ============================================================================
-# MANAGER
-# ============================================================================
+class LazyStudents(StoredStudents):
+    """Student mapping over raw records in memory, hydrated on first access"""
+    
+    def __init__(self, records, student_class=Student, trusted=False):
+        super().__init__(None, student_class, trusted)
+        self._records = records
+    
+    def _record(self, student_id):
+        # Hydrated students live in the cache, so the raw record can go
+        return self._records.pop(student_id, None)
+    
+    def _ids(self):
+        return list(self._records)
+    
+    def __len__(self):
+        return len(self._cache) + len(self._records)
+    
+    def records(self):
+        cached = list(self._cache.items())
+        for sid, student in cached:
+            yield sid, student.to_dict()
+        for sid, record in list(self._records.items()):
+            if sid not in self._cache and sid not in self._removed:
+                yield sid, record
 
 class StudentManager:
     """Main student management class"""
     
-    def __init__(self, storage=None):
+    # Secondary indexes, built the first time they are needed
+    INDEX_TYPES = {
+        'search': TrigramIndex,
+        'fuzzy': FuzzyNameIndex,
+        'status': StatusIndex,
+        'email': EmailIndex,
+        'courses': CourseStatsIndex,
+        'name': NameOrderIndex,
+        'gpa': GPAOrderIndex,
+    }
+    
+    def __init__(self, storage=None, student_class=Student, lazy=False, trusted=False):
         self.storage = storage or MemoryStorage()
-        self.students = {}
-        self._load()
+        self.student_class = student_class
+        self.trusted = trusted  # Skip validation of data we wrote ourselves
+        self._dirty = {}  # Student IDs waiting to be saved, in change order
+        self._batch_depth = 0
+        self._undo = None
+        self._undo_dirty = None
+        self._savepoints = []  # (undo, undo_dirty) of each enclosing batch
+        self._indexes = {}
+        
+        # Queryable storage answers lookups itself, so nothing is loaded up front
+        self._pushdown = isinstance(self.storage, QueryableStorage)
+        if self._pushdown:
+            self.students = StoredStudents(self.storage, student_class, trusted)
+        elif lazy:
+            self.students = LazyStudents(self.storage.lazy_records(), student_class, trusted)
+        else:
+            self.students = {}
+            self._load()
     
     def _load(self):
-        """Load students from storage"""
-        data = self.storage.load()
-        for sid, student_data in data.items():
-            try:
-                self.students[sid] = Student.from_dict(student_data)
-            except (ValidationError, KeyError) as e:
-                print(f"Warning: Could not load student {sid}: {e}")
+        """Load students from storage, one record at a time"""
+        records = self.storage.iter_records()
+        try:
+            for sid, student_data in records:
+                try:
+                    student = self.student_class.from_dict(student_data, trusted=self.trusted)
+                    self.students[student.student_id] = student
+                except (ValidationError, KeyError) as e:
+                    print(f"Warning: Could not load student {sid}: {e}")
+        except json.JSONDecodeError as e:
+            print(f"Warning: Stopped loading at a corrupt record: {e}")
+    
+    def _save(self, student_id):
+        """Mark a student as changed and save unless a batch is open"""
+        self._dirty[student_id] = None
+        self._reindex(student_id)
+        if not self._batch_depth:
+            self._flush()
+    
+    def _index(self, name):
+        """Get a secondary index, building it on first use"""
+        index = self._indexes.get(name)
+        if index is None:
+            index = self.INDEX_TYPES[name]()
+            # Index a lazy roster's raw records where possible rather than hydrate it all
+            if not (isinstance(self.students, StoredStudents) and index.build_records(self.students.records())):
+                index.build(self.students.values())
+            self._indexes[name] = index
+        return index
+    
+    def _reindex(self, student_id):
+        """Bring every built index up to date for one student"""
+        if not self._indexes:
+            return
+        student = self.students.get(student_id)
+        for index in self._indexes.values():
+            if student is None:
+                index.remove(student_id)
+            else:
+                index.update(student)
+    
+    def _take_changes(self):
+        """Serialize and clear the pending changes: (changed records, removed IDs)"""
+        changed, removed = {}, []
+        for sid in self._dirty:
+            student = self.students.get(sid)
+            if student is not None:
+                changed[sid] = student.to_dict()
+            else:
+                removed.append(sid)
+        self._dirty.clear()
+        return changed, removed
+    
+    def _flush(self):
+        """Write all pending changes to storage in one call"""
+        if not self._dirty:
+            return
+        changed, removed = self._take_changes()
+        self.storage.save_changes(changed, removed, self._all_records)
+    
+    def _all_records(self):
+        """(student_id, record) pairs for the whole roster"""
+        if isinstance(self.students, StoredStudents):
+            yield from self.students.records()
+        else:
+            for sid, student in self.students.items():
+                yield sid, student.to_dict()
+    
+    def _remember(self, student_id):
+        """Record a student's state before the innermost batch so it can be rolled back"""
+        if self._undo is None or student_id in self._undo:
+            return
+        student = self.students.get(student_id)
+        if student is None:
+            self._undo[student_id] = None
+        else:
+            self._undo[student_id] = student.to_dict()
+    
+    def _rollback(self):
+        """Restore every student touched by the innermost batch"""
+        for sid, record in self._undo.items():
+            if record is None:
+                self.students.pop(sid, None)
+            else:
+                self.students[sid] = self.student_class.from_dict(record, trusted=True)
+            self._reindex(sid)
+        self._undo = None
+        # Changes queued before the batch (not yet saved) are still pending
+        self._dirty = self._undo_dirty
+        self._undo_dirty = None
+    
+    @contextmanager
+    def batch(self):
+        """Defer saving until the block exits; roll back if it raises.
+        
+        A nested batch is a savepoint: if it raises, only its own changes are
+        undone, and the enclosing batch carries on if the caller handles the error.
+        """
+        outer = self._batch_depth == 0
+        if not outer:
+            self._savepoints.append((self._undo, self._undo_dirty))
+        self._undo = {}
+        self._undo_dirty = dict(self._dirty)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            raise
+        finally:
+            self._batch_depth -= 1
+            if not outer:
+                inner = self._undo
+                self._undo, self._undo_dirty = self._savepoints.pop()
+                # The enclosing batch undoes to its own, earlier snapshot
+                for sid, record in (inner or {}).items():
+                    self._undo.setdefault(sid, record)
+        
+        if outer:
+            self._undo = None
+            self._undo_dirty = None
+            self._flush()
     
-    def _save(self):
-        """Save students to storage"""
-        data = {sid: s.to_dict() for sid, s in self.students.items()}
-        self.storage.save(data)
+    def close(self):
+        """Flush and release the storage"""
+        self._flush()
+        self.storage.close()
     
     def add_student(self, student_id, name, email):
         """Add a new student"""
@@ -225,9 +1769,11 @@ class StudentManager:
         if student_id in self.students:
             raise DuplicateStudentError(student_id)
         
-        student = Student(student_id, name, email)
+        student = self.student_class(student_id, name, email)
+        self._check_email(student.email, student_id)
+        self._remember(student.student_id)
         self.students[student_id] = student
-        self._save()
+        self._save(student_id)
         return student
     
     def get_student(self, student_id):
@@ -237,45 +1783,688 @@ class StudentManager:
             raise StudentNotFoundError(student_id)
         return self.students[student_id]
     
+    def _email_owners(self, email):
+        """IDs of students using a (normalized) email"""
+        if self._pushdown:
+            return [s.student_id for s in self._query(self.storage.by_email(email),
+                                                      lambda s: s.email == email)]
+        # A lazy roster indexes raw records, some of which may fail to load
+        return [sid for sid in self._index('email').ids(email) if self.students.get(sid) is not None]
+    
+    def _check_email(self, email, student_id):
+        """Raise DuplicateEmailError if a different student already uses email"""
+        for owner in self._email_owners(email):
+            if owner != student_id:
+                raise DuplicateEmailError(email, owner)
+    
+    def get_by_email(self, email):
+        """The student with this email, or None"""
+        owners = self._email_owners(email.lower().strip())
+        return self.students[owners[0]] if owners else None
+    
     def update_student(self, student_id, **kwargs):
         """Update student fields"""
         student = self.get_student(student_id)
+        self._remember(student.student_id)
         
-        if 'name' in kwargs:
-            student.name = kwargs['name']
-        if 'email' in kwargs:
-            student.email = kwargs['email']
-        
-        self._save()
+        old_name, old_email = student.name, student.email
+        try:
+            if 'name' in kwargs:
+                student.name = kwargs['name']
+            if 'email' in kwargs:
+                student.email = kwargs['email']
+                self._check_email(student.email, student.student_id)
+        except Exception:
+            # All or nothing: a rejected email must not leave the new name behind
+            student.name, student.email = old_name, old_email
+            raise
+        self._save(student.student_id)
         return student
     
     def delete_student(self, student_id):
         """Delete a student"""
         student = self.get_student(student_id)
-        del self.students[student_id.upper()]
-        self._save()
+        self._remember(student.student_id)
+        del self.students[student.student_id]
+        self._save(student.student_id)
         return student
     
     def add_grade(self, student_id, course, grade):
         """Add grade to a student"""
         student = self.get_student(student_id)
+        self._remember(student.student_id)
         student.add_grade(course, grade)
-        self._save()
+        self._save(student.student_id)
         return student
     
-    def search(self, query):
-        """Search students by name or email"""
+    def remove_grade(self, student_id, course):
+        """Remove a student's grade for a course"""
+        student = self.get_student(student_id)
+        self._remember(student.student_id)
+        student.remove_grade(course)
+        self._save(student.student_id)
+        return student
+    
+    def bulk_add_students(self, rows):
+        """Add many (student_id, name, email) rows, saving once at the end"""
+        with self.batch():
+            return [self.add_student(*row) for row in rows]
+    
+    def bulk_add_grades(self, rows):
+        """Add many (student_id, course, grade) rows, saving once at the end"""
+        with self.batch():
+            return [self.add_grade(*row) for row in rows]
+    
+    def _query(self, records, predicate):
+        """Hydrate storage results, letting unsaved changes override them"""
+        results = []
+        for record in records:
+            if record['student_id'] in self._dirty:
+                continue
+            student = self.students.hydrate(record)
+            if student is not None:
+                results.append(student)
+        for sid in self._dirty:
+            student = self.students.get(sid)
+            if student is not None and predicate(student):
+                results.append(student)
+        return results
+    
+    def search(self, query, fuzzy=False, max_distance=2):
+        """Search students by name or email.
+        
+        With fuzzy=True, match names instead, allowing up to max_distance typos
+        in total; results come closest first.
+        """
+        if fuzzy:
+            if not 0 <= max_distance <= FuzzyNameIndex.MAX_DISTANCE:
+                raise ValidationError(f"max_distance must be 0-{FuzzyNameIndex.MAX_DISTANCE}")
+            return [self.students[sid] for _, sid in self._index('fuzzy').search(query, max_distance)]
+        
         query = query.lower()
-        return [s for s in self.students.values() 
-                if query in s.name.lower() or query in s.email.lower()]
+        def matches(s):
+            return query in s.name.lower() or query in s.email.lower()
+        
+        if self._pushdown:
+            return self._query(self.storage.search(query), matches)
+        return [self.students[sid] for sid in self._index('search').search(query)]
     
     def get_all(self):
         """Get all students"""
         return list(self.students.values())
     
+    def iter_records(self):
+        """(student_id, record) pairs for the whole roster, without hydrating students"""
+        return self._all_records()
+    
+    def iter_all(self):
+        """Yield every student, one at a time.
+        
+        The roster must not change during the walk - use page() for that.
+        """
+        yield from self.students.values()
+    
     def get_by_status(self, status):
         """Get students by academic status"""
-        return [s for s in self.students.values() if s.status == status]
+        return list(self.iter_by_status(status))
+    
+    def iter_by_status(self, status):
+        """Iterate students with the given academic status"""
+        if self._pushdown:
+            if status not in Student.STATUS_RANGES:
+                return iter(())
+            return iter(self.get_by_gpa(*Student.STATUS_RANGES[status]))
+        return (self.students[sid] for sid in self._index('status').ids(status))
+    
+    def get_by_gpa(self, min_gpa, max_gpa=None):
+        """Get students with min_gpa <= GPA < max_gpa"""
+        def matches(s):
+            return s.gpa >= min_gpa and (max_gpa is None or s.gpa < max_gpa)
+        
+        if self._pushdown:
+            return self._query(self.storage.by_gpa(min_gpa, max_gpa), matches)
+        return [s for s in self.students.values() if matches(s)]
+    
+    def courses(self):
+        """Sorted names of all graded courses"""
+        if self._pushdown:
+            names = set(self.storage.courses())
+            for sid in self._dirty:
+                student = self.students.get(sid)
+                if student is not None:
+                    names.update(student.grades)
+            return sorted(names)
+        return self._index('courses').courses()
+    
+    def course_stats(self, course):
+        """Enrollment, mean grade points and grade distribution for a course"""
+        if self._pushdown:
+            counts = Counter(self.storage.grade_counts(course))
+            # Swap saved grades for unsaved ones
+            for sid in self._dirty:
+                saved = self.storage.get(sid)
+                current = self.students.get(sid)
+                if saved is not None and course in saved['grades']:
+                    counts[saved['grades'][course]] -= 1
+                if current is not None and course in current.grades:
+                    counts[current.grades[course]] += 1
+        else:
+            counts = self._index('courses').counts(course)
+        
+        enrolled = sum(counts.values())
+        points = sum(Student.GRADE_TENTHS[g] * n for g, n in counts.items())
+        return {
+            'course': course,
+            'enrolled': enrolled,
+            'mean_points': round(points / enrolled / 10, 2) if enrolled else 0.0,
+            'distribution': {g: counts[g] for g in Student.VALID_GRADES if counts.get(g)},
+        }
+    
+    def iter_sorted(self, by='name', start=None, limit=None):
+        """Iterate students by name (A-Z) or GPA (highest first).
+        
+        Starts at the first name >= start, or the first GPA <= start, and stops
+        after limit students.
+        """
+        return self._sorted(by, start, limit)
+    
+    def _sorted(self, by, start=None, limit=None, after=None):
+        """iter_sorted(), optionally resuming after a (value, student_id) pair"""
+        if by not in ('name', 'gpa'):
+            raise ValidationError(f"Cannot sort students by {by!r}")
+        
+        if self._pushdown:
+            index_type = self.INDEX_TYPES[by]
+            key = index_type.key
+            first = None if start is None else index_type.start_key(start)
+            last = None if after is None else (index_type.start_key(after[0]), after[1])
+            def matches(s):
+                return ((first is None or key(s) >= first) and
+                        (last is None or (key(s), s.student_id) > last))
+            
+            # Fetch enough extra rows that unsaved changes can't leave the page short
+            fetch = None if limit is None else limit + len(self._dirty)
+            results = self._query(self.storage.ordered(by, start, fetch, after), matches)
+            results.sort(key=lambda s: (key(s), s.student_id))
+            return iter(results[:limit])
+        return (self.students[sid] for sid in self._index(by).ids(start, limit, after))
+    
+    def top_by_gpa(self, k):
+        """The k students with the highest GPA"""
+        return list(self.iter_sorted('gpa', limit=k))
+    
+    def page(self, cursor=None, size=20, by='name'):
+        """One page of students in name or GPA order: (students, next cursor).
+        
+        Start with cursor=None and pass back the returned cursor, which is None
+        after the last page. A cursor holds the last student shown rather than
+        a position, so adds and deletes between pages don't shift later pages.
+        """
+        if size < 1:
+            raise ValidationError("Page size must be at least 1")
+        after = None
+        if cursor is not None:
+            try:
+                by, value, sid = json.loads(base64.urlsafe_b64decode(cursor))
+            except (ValueError, TypeError):
+                raise ValidationError(f"Invalid page cursor: {cursor!r}")
+            # A tampered cursor must not reach the index comparisons as the wrong type
+            value_types = {'name': (str,), 'gpa': (int, float)}.get(by) if isinstance(by, str) else None
+            if (value_types is None or not isinstance(sid, str) or
+                    not isinstance(value, value_types) or isinstance(value, bool)):
+                raise ValidationError(f"Invalid page cursor: {cursor!r}")
+            after = (value, sid)
+        
+        # One extra student tells us whether there is another page
+        students = list(self._sorted(by, None, size + 1, after))
+        if len(students) <= size:
+            return students, None
+        last = students[size - 1]
+        token = json.dumps([by, getattr(last, by), last.student_id]).encode('utf-8')
+        return students[:size], base64.urlsafe_b64encode(token).decode('ascii')
+
+class ReadWriteLock:
+    """Many readers or one writer. The writer may re-enter and may also read."""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None  # Thread ident of the writer
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+    
+    def is_writer(self):
+        """True if the calling thread holds the write lock"""
+        return self._writer == threading.get_ident()
+    
+    @contextmanager
+    def reading(self):
+        if self.is_writer():
+            yield
+            return
+        
+        depth = getattr(self._local, 'depth', 0)
+        if not depth:
+            with self._cond:
+                # Waiting writers go first so they can't be starved
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if not depth:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+    
+    @contextmanager
+    def writing(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._writers_waiting += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+class ThreadSafeStudentManager(StudentManager):
+    """Student manager that many threads can share.
+    
+    Reads run in parallel, writes are exclusive. Changes are serialized under
+    the write lock, but written to storage after it is released.
+    """
+    
+    def __init__(self, storage=None, **kwargs):
+        self._lock = ReadWriteLock()
+        self._index_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._outbox = deque()  # (changed, removed) waiting to be written, oldest first
+        super().__init__(storage, **kwargs)
+    
+    def _flush(self):
+        # Runs under the write lock: only queue the changes
+        if self._dirty:
+            self._outbox.append(self._take_changes())
+    
+    def _write_outbox(self):
+        """Write queued changes to storage, merged into one call"""
+        if self._lock.is_writer():
+            return  # Still inside a batch - the outermost call writes
+        with self._io_lock:
+            changed, removed = {}, {}
+            while self._outbox:
+                more_changed, more_removed = self._outbox.popleft()
+                for sid in more_removed:
+                    changed.pop(sid, None)
+                    removed[sid] = None
+                for sid, record in more_changed.items():
+                    removed.pop(sid, None)
+                    changed[sid] = record
+            if changed or removed:
+                self.storage.save_changes(changed, list(removed), self._snapshot)
+    
+    def _snapshot(self):
+        with self._lock.reading():
+            return iter(list(self._all_records()))
+    
+    def _index(self, name):
+        # Several readers may ask for an index that isn't built yet
+        index = self._indexes.get(name)
+        if index is None:
+            with self._index_lock:
+                index = super()._index(name)
+        return index
+    
+    def _write(self, method, *args, **kwargs):
+        with self._lock.writing():
+            result = method(*args, **kwargs)
+        self._write_outbox()
+        return result
+    
+    def _read(self, method, *args, **kwargs):
+        with self._lock.reading():
+            return method(*args, **kwargs)
+    
+    @contextmanager
+    def batch(self):
+        """Hold the write lock for the whole batch"""
+        with self._lock.writing():
+            with super().batch():
+                yield self
+        self._write_outbox()
+    
+    def close(self):
+        with self._lock.writing():
+            super()._flush()
+        self._write_outbox()
+        self.storage.close()
+    
+    def add_student(self, student_id, name, email):
+        return self._write(super().add_student, student_id, name, email)
+    
+    def update_student(self, student_id, **kwargs):
+        return self._write(super().update_student, student_id, **kwargs)
+    
+    def delete_student(self, student_id):
+        return self._write(super().delete_student, student_id)
+    
+    def add_grade(self, student_id, course, grade):
+        return self._write(super().add_grade, student_id, course, grade)
+    
+    def remove_grade(self, student_id, course):
+        return self._write(super().remove_grade, student_id, course)
+    
+    def get_student(self, student_id):
+        return self._read(super().get_student, student_id)
+    
+    def get_by_email(self, email):
+        return self._read(super().get_by_email, email)
+    
+    def search(self, query, fuzzy=False, max_distance=2):
+        return self._read(super().search, query, fuzzy, max_distance)
+    
+    def get_all(self):
+        return self._read(super().get_all)
+    
+    def get_by_status(self, status):
+        return self._read(super().get_by_status, status)
+    
+    def iter_records(self):
+        return self._snapshot()
+    
+    def iter_all(self):
+        # A page at a time, so writers can get in between pages
+        cursor = None
+        while True:
+            students, cursor = self.page(cursor, 1000)
+            yield from students
+            if cursor is None:
+                return
+    
+    def iter_by_status(self, status):
+        with self._lock.reading():
+            return iter(list(super().iter_by_status(status)))
+    
+    def get_by_gpa(self, min_gpa, max_gpa=None):
+        return self._read(super().get_by_gpa, min_gpa, max_gpa)
+    
+    def courses(self):
+        return self._read(super().courses)
+    
+    def course_stats(self, course):
+        return self._read(super().course_stats, course)
+    
+    def iter_sorted(self, by='name', start=None, limit=None):
+        # Take the whole page under the lock, iterate it after
+        with self._lock.reading():
+            return iter(list(super().iter_sorted(by, start, limit)))
+    
+    def top_by_gpa(self, k):
+        return self._read(super().top_by_gpa, k)
+    
+    def page(self, cursor=None, size=20, by='name'):
+        return self._read(super().page, cursor, size, by)
+
+class AsyncStudentManager(StudentManager):
+    """Student manager for asyncio code: changes apply in memory at once and are
+    written in the background, coalesced every `flush_interval` seconds or
+    every `max_pending` changes, whichever comes first.
+    
+    Use it as `async with AsyncStudentManager(storage) as manager: ...`
+    """
+    
+    def __init__(self, storage=None, flush_interval=0.1, max_pending=1000, **kwargs):
+        super().__init__(storage, **kwargs)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._stopping = False
+    
+    def _save(self, student_id):
+        """Mark a student as changed; the background task writes it later"""
+        self._dirty[student_id] = None
+        self._reindex(student_id)
+        if len(self._dirty) >= self.max_pending:
+            self._wake.set()
+    
+    def _flush(self):
+        # Called when a batch ends - hand the work to the background task
+        self._wake.set()
+    
+    async def start(self):
+        """Start the background writer"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._writer())
+    
+    async def _writer(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Warning: Background save failed, will retry: {e}")
+    
+    async def flush(self):
+        """Write every pending change to storage (a durability point)
+        
+        Changes made inside an open batch are left for the batch to finish.
+        """
+        async with self._flush_lock:
+            if self._batch_depth or not self._dirty:
+                return
+            changed, removed = self._take_changes()
+            loop = asyncio.get_running_loop()
+            
+            def all_records():
+                # Storage runs in a worker thread; read the roster on the event loop
+                snapshot = asyncio.run_coroutine_threadsafe(self._snapshot(), loop)
+                return iter(snapshot.result())
+            
+            try:
+                await asyncio.to_thread(self.storage.save_changes, changed, removed, all_records)
+            except BaseException:
+                # Put the changes back so the next flush retries them
+                for sid in [*changed, *removed]:
+                    self._dirty.setdefault(sid)
+                raise
+    
+    async def _snapshot(self):
+        return list(self._all_records())
+    
+    async def close(self):
+        """Stop the background writer, flush, and release the storage"""
+        if self._task is not None:
+            # Let a save in progress finish: cancelling would abandon its
+            # worker thread while the final flush writes the same storage
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self.storage.close)
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+# ============================================================================
+# CSV IMPORT / EXPORT
+# ============================================================================
+
+class StudentCSV:
+    """Streaming CSV import and export for a StudentManager.
+    
+    Import is a chain of generators - read, parse, validate, batch - applied a
+    batch at a time with a checkpoint after each, so memory holds one batch no
+    matter how big the file is. A row carries a student (name, email), a grade
+    (course, grade) or both; students that already exist are updated.
+    """
+    
+    COLUMNS = ['student_id', 'name', 'email', 'course', 'grade']
+    
+    def __init__(self, manager, batch_size=1000):
+        self.manager = manager
+        self.batch_size = batch_size
+    
+    def read(self, path, skip=0):
+        """Yield (line number, raw row), skipping rows imported by an earlier run"""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is not None and 'student_id' not in reader.fieldnames:
+                raise ValidationError(f"{path} has no student_id column")
+            for i, row in enumerate(reader):
+                if i >= skip:
+                    yield reader.line_num, row
+    
+    def parse(self, rows):
+        """Yield (line, raw row, fields or error) with the known columns stripped"""
+        for line, row in rows:
+            if None in row:
+                yield line, row, ValidationError("Too many fields")
+                continue
+            yield line, row, {k: (row.get(k) or '').strip() for k in self.COLUMNS}
+    
+    def validate(self, rows):
+        """Yield (line, raw row, (student or None, course, grade) or error)"""
+        for line, row, fields in rows:
+            if isinstance(fields, Exception):
+                yield line, row, fields
+                continue
+            try:
+                student = None
+                if not fields['student_id']:
+                    raise ValidationError("Missing student ID")
+                if fields['name'] or fields['email']:
+                    # A throwaway student runs every field check and normalizes the values
+                    student = self.manager.student_class(fields['student_id'], fields['name'],
+                                                         fields['email'])
+                course, grade = fields['course'], fields['grade'].upper()
+                if bool(course) != bool(grade):
+                    raise ValidationError("Course and grade must be given together")
+                if grade and grade not in Student.VALID_GRADES:
+                    raise ValidationError(f"Invalid grade: {grade}")
+                if student is None and not course:
+                    raise ValidationError("Row has neither a student nor a grade")
+            except StudentError as e:
+                yield line, row, e
+                continue
+            yield line, row, (fields['student_id'], student, course, grade)
+    
+    def batches(self, rows):
+        """Group rows into lists of batch_size"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _apply(self, student_id, student, course, grade):
+        manager = self.manager
+        if student is not None:
+            try:
+                current = manager.get_student(student_id)
+            except StudentNotFoundError:
+                manager.add_student(student.student_id, student.name, student.email)
+            else:
+                if (current.name, current.email) != (student.name, student.email):
+                    manager.update_student(student_id, name=student.name, email=student.email)
+        if course:
+            manager.add_grade(student_id, course, grade)
+    
+    def import_file(self, path, errors_path=None, checkpoint_path=None):
+        """Import a CSV file, resuming after the last checkpoint if there is one.
+        
+        Rejected rows go to errors_path with their line number and the reason.
+        Returns {'imported', 'rejected', 'resumed_at'} row counts.
+        """
+        errors_path = errors_path or path + '.errors.csv'
+        checkpoint_path = checkpoint_path or path + '.checkpoint'
+        done = 0
+        try:
+            with open(checkpoint_path) as f:
+                done = json.load(f)['rows']
+        except FileNotFoundError:
+            pass
+        summary = {'imported': 0, 'rejected': 0, 'resumed_at': done}
+        
+        fresh = not done or not os.path.exists(errors_path)
+        with open(errors_path, 'w' if fresh else 'a', newline='', encoding='utf-8') as errors_file:
+            errors = csv.writer(errors_file)
+            if fresh:
+                errors.writerow(['line', 'error'] + self.COLUMNS)
+            
+            rows = self.validate(self.parse(self.read(path, skip=done)))
+            for batch in self.batches(rows):
+                rejected = []
+                with self.manager.batch():
+                    for line, row, item in batch:
+                        if not isinstance(item, Exception):
+                            try:
+                                self._apply(*item)
+                                continue
+                            except StudentError as e:
+                                item = e
+                        rejected.append([line, str(item)] + [row.get(k) or '' for k in self.COLUMNS])
+                
+                # The batch is saved - report its bad rows and record how far we got
+                errors.writerows(rejected)
+                errors_file.flush()
+                summary['imported'] += len(batch) - len(rejected)
+                summary['rejected'] += len(rejected)
+                done += len(batch)
+                tmp = checkpoint_path + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump({'rows': done}, f)
+                os.replace(tmp, checkpoint_path)
+        
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return summary
+    
+    def export_file(self, path):
+        """Write the roster as CSV, one row per grade, streaming; returns students written"""
+        count = 0
+        tmp = path + '.tmp'
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            for sid, record in self.manager.iter_records():
+                base = [sid, record['name'], record['email']]
+                if not record['grades']:
+                    writer.writerow(base + ['', ''])
+                for course, grade in record['grades'].items():
+                    writer.writerow(base + [course, grade])
+                count += 1
+        os.replace(tmp, path)
+        return count
 
 # ============================================================================
 # CLI INTERFACE
@@ -295,6 +2484,9 @@ class StudentCLI:
             '6': ('Add grade', self.add_grade),
             '7': ('Search students', self.search_students),
             '8': ('View by status', self.view_by_status),
+            '9': ('Course statistics', self.view_course_stats),
+            'i': ('Import CSV', self.import_csv),
+            'e': ('Export CSV', self.export_csv),
             '0': ('Exit', None)
         }
     
@@ -327,17 +2519,25 @@ class StudentCLI:
             else:
                 print("\n❌ Invalid choice")
     
-    def list_students(self):
-        """List all students"""
-        students = self.manager.get_all()
+    def list_students(self, page_size=20):
+        """List all students, a page at a time"""
+        students, cursor = self.manager.page(size=page_size)
         if not students:
             print("\n📭 No students found")
             return
         
-        print(f"\n📚 Students ({len(students)}):")
+        print("\n📚 Students:")
         print("-" * 60)
-        for s in sorted(students, key=lambda x: x.name):
-            print(f"  {s}")
+        shown = 0
+        while True:
+            for s in students:
+                print(f"  {s}")
+            shown += len(students)
+            if cursor is None:
+                break
+            if input(f"\n-- {shown} shown. Enter for more, q to stop: ").strip().lower() == 'q':
+                break
+            students, cursor = self.manager.page(cursor, page_size)
     
     def add_student(self):
         """Add a new student"""
@@ -351,8 +2551,14 @@ class StudentCLI:
     
     def view_student(self):
         """View student details"""
-        student_id = input("\nStudent ID: ").strip()
-        student = self.manager.get_student(student_id)
+        key = input("\nStudent ID or email: ").strip()
+        if '@' in key:
+            student = self.manager.get_by_email(key)
+            if student is None:
+                print(f"\n📭 No student with email {key}")
+                return
+        else:
+            student = self.manager.get_student(key)
         
         print(f"\n👤 STUDENT DETAILS")
         print("=" * 40)
@@ -362,9 +2568,10 @@ class StudentCLI:
         print(f"GPA: {student.gpa}")
         print(f"Status: {student.status}")
         
-        if student._grades:
+        grades = student.grades
+        if grades:
             print("\n📊 Grades:")
-            for course, grade in student._grades.items():
+            for course, grade in grades.items():
                 print(f"  {course}: {grade}")
     
     def update_student(self):
@@ -415,6 +2622,10 @@ class StudentCLI:
         """Search for students"""
         query = input("\nSearch (name or email): ").strip()
         results = self.manager.search(query)
+        if not results and query:
+            results = self.manager.search(query, fuzzy=True)
+            if results:
+                print("\n🤔 No exact matches - showing close spellings")
         
         if not results:
             print("\n📭 No results found")
@@ -435,6 +2646,258 @@ class StudentCLI:
             print(f"\n👥 {status} ({len(results)}):")
             for s in results:
                 print(f"  {s}")
+    
+    def view_course_stats(self):
+        """View statistics for one course"""
+        courses = self.manager.courses()
+        if not courses:
+            print("\n📭 No grades recorded yet")
+            return
+        print(f"\nCourses: {', '.join(courses)}")
+        course = input("Course name: ").strip()
+        
+        stats = self.manager.course_stats(course)
+        if not stats['enrolled']:
+            print(f"\n📭 No grades for '{course}'")
+            return
+        print(f"\n📈 {course}")
+        print("=" * 40)
+        print(f"Enrolled: {stats['enrolled']}")
+        print(f"Mean grade points: {stats['mean_points']}")
+        print("\n📊 Distribution:")
+        for grade, count in stats['distribution'].items():
+            print(f"  {grade:<3} {'█' * max(1, round(30 * count / stats['enrolled']))} {count}")
+    
+    def import_csv(self):
+        """Import students and grades from a CSV file"""
+        path = input("\nCSV file: ").strip()
+        try:
+            summary = StudentCSV(self.manager).import_file(path)
+        except OSError as e:
+            print(f"\n❌ Could not read {path}: {e}")
+            return
+        if summary['resumed_at']:
+            print(f"\n↪️  Resumed after row {summary['resumed_at']:,}")
+        print(f"\n✅ Imported {summary['imported']:,} rows")
+        if summary['rejected']:
+            print(f"⚠️  Rejected {summary['rejected']:,} rows - see {path}.errors.csv")
+    
+    def export_csv(self):
+        """Export the roster to a CSV file"""
+        path = input("\nCSV file: ").strip()
+        try:
+            count = StudentCSV(self.manager).export_file(path)
+        except OSError as e:
+            print(f"\n❌ Could not write {path}: {e}")
+            return
+        print(f"\n✅ Exported {count:,} students to {path}")
+
+# ============================================================================
+# HTTP API
+# ============================================================================
+
+class StudentRequestHandler(BaseHTTPRequestHandler):
+    """JSON API over the server's StudentManager
+    
+    GET    /students                 all students (?q=text to search, &fuzzy=1 to allow typos,
+                                     ?status=name to filter, ?email=address to look up)
+                                     or pages of them (?limit=n, then &cursor= from "next")
+    POST   /students                 {"student_id", "name", "email"}
+    GET    /students/<id>            one student
+    PATCH  /students/<id>            {"name"} and/or {"email"}
+    DELETE /students/<id>
+    POST   /students/<id>/grades     {"course", "grade"}
+    """
+    
+    protocol_version = 'HTTP/1.1'  # Keep connections alive between requests
+    disable_nagle_algorithm = True  # Headers and body go out separately - don't delay the body
+    
+    ERROR_STATUS = [
+        (StudentNotFoundError, 404),
+        (DuplicateStudentError, 409),
+        (DuplicateEmailError, 409),
+        (StudentError, 400),
+    ]
+    
+    @staticmethod
+    def _student_json(student):
+        data = student.to_dict()
+        data['gpa'] = student.gpa
+        data['status'] = student.status
+        return data
+    
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _body(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # Can't tell where the body ends
+            raise ValidationError("Content-Length must be a whole number")
+        if not length:
+            return {}
+        try:
+            data = json.loads(self.rfile.read(length))
+        except UnicodeDecodeError:
+            raise ValidationError("Request body must be UTF-8")
+        if not isinstance(data, dict):
+            raise ValidationError("Request body must be a JSON object")
+        return data
+    
+    @staticmethod
+    def _field(body, name):
+        value = body.get(name, '')
+        if not isinstance(value, str):
+            raise ValidationError(f"{name} must be a string")
+        return value
+    
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip('/').split('/')]
+        manager = self.server.manager
+        
+        try:
+            body = self._body() if method in ('POST', 'PATCH') else {}
+            if parts[0] != 'students' or len(parts) > 3:
+                return self._send(404, {'error': f"No route for {url.path}"})
+            
+            if len(parts) == 1 and method == 'GET':
+                query = parse_qs(url.query)
+                if 'q' in query:
+                    students = manager.search(query['q'][0], fuzzy=query.get('fuzzy') == ['1'])
+                elif 'status' in query:
+                    students = manager.get_by_status(query['status'][0])
+                elif 'email' in query:
+                    student = manager.get_by_email(query['email'][0])
+                    students = [student] if student is not None else []
+                elif 'limit' in query or 'cursor' in query:
+                    try:
+                        size = int(query.get('limit', ['20'])[0])
+                    except ValueError:
+                        raise ValidationError("limit must be a whole number")
+                    students, cursor = manager.page(query.get('cursor', [None])[0], size)
+                    return self._send(200, {'students': [self._student_json(s) for s in students],
+                                            'next': cursor})
+                else:
+                    students = manager.get_all()
+                return self._send(200, [self._student_json(s) for s in students])
+            if len(parts) == 1 and method == 'POST':
+                student = manager.add_student(self._field(body, 'student_id'), self._field(body, 'name'),
+                                              self._field(body, 'email'))
+                return self._send(201, self._student_json(student))
+            
+            student_id = parts[1]
+            if len(parts) == 2 and method == 'GET':
+                return self._send(200, self._student_json(manager.get_student(student_id)))
+            if len(parts) == 2 and method == 'PATCH':
+                updates = {k: self._field(body, k) for k in ('name', 'email') if k in body}
+                return self._send(200, self._student_json(manager.update_student(student_id, **updates)))
+            if len(parts) == 2 and method == 'DELETE':
+                return self._send(200, self._student_json(manager.delete_student(student_id)))
+            if len(parts) == 3 and parts[2] == 'grades' and method == 'POST':
+                student = manager.add_grade(student_id, self._field(body, 'course'), self._field(body, 'grade'))
+                return self._send(200, self._student_json(student))
+            return self._send(405, {'error': f"{method} not allowed on {url.path}"})
+        
+        except json.JSONDecodeError as e:
+            return self._send(400, {'error': f"Invalid JSON: {e}"})
+        except StudentError as e:
+            status = next(code for error, code in self.ERROR_STATUS if isinstance(e, error))
+            return self._send(status, {'error': str(e)})
+    
+    def do_GET(self):
+        self._handle('GET')
+    
+    def do_POST(self):
+        self._handle('POST')
+    
+    def do_PATCH(self):
+        self._handle('PATCH')
+    
+    def do_DELETE(self):
+        self._handle('DELETE')
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class StudentServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one thread-safe StudentManager"""
+    
+    daemon_threads = True
+    
+    def __init__(self, manager, host='127.0.0.1', port=8000, verbose=True):
+        super().__init__((host, port), StudentRequestHandler)
+        self.manager = manager
+        self.verbose = verbose
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def load_test(host, port, student_ids, clients=8, requests=2000, read_ratio=0.9):
+    """Hit a StudentServer from `clients` keep-alive connections and report latency"""
+    latencies = [[] for _ in range(clients)]
+    failures = [0] * clients
+    
+    def client(n):
+        rng = random.Random(n)
+        conn = HTTPConnection(host, port)
+        for _ in range(requests // clients):
+            sid = quote(rng.choice(student_ids))
+            roll = rng.random()
+            if roll < read_ratio / 2:
+                method, path, body = 'GET', f"/students/{sid}", None
+            elif roll < read_ratio:
+                method, path, body = 'GET', f"/students?q={sid[-4:]}", None
+            else:
+                grade = rng.choice(Student.VALID_GRADES)
+                method, path, body = 'POST', f"/students/{sid}/grades", json.dumps(
+                    {'course': 'Load Test', 'grade': grade})
+            
+            start = time.perf_counter()
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            latencies[n].append(time.perf_counter() - start)
+            if response.status >= 400:
+                failures[n] += 1
+        conn.close()
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    
+    samples = sorted(x for per_client in latencies for x in per_client)
+    print(f"\n🌐 LOAD TEST: {len(samples):,} requests, {clients} clients, {read_ratio:.0%} reads")
+    print(f"  Throughput: {len(samples) / elapsed:,.0f} req/s")
+    for pct in (50, 95, 99):
+        print(f"  p{pct}: {percentile(samples, pct) * 1000:.2f}ms")
+    print(f"  Errors: {sum(failures)}")
+
+def serve(manager, host='127.0.0.1', port=8000):
+    """Run the HTTP API until Ctrl+C"""
+    server = StudentServer(manager, host, port)
+    print(f"\n🌐 Serving on http://{host}:{server.server_port}/students (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping server")
+    finally:
+        server.server_close()
 
 # ============================================================================
 # DEMO
@@ -499,16 +2962,317 @@ def demo():
     print("✅ Demo complete!")
     print("=" * 60)
 
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def make_records(count):
+    """Build `count` synthetic student records (already valid, no Student objects)"""
+    courses = ['Python', 'Math', 'English', 'Physics', 'History']
+    grades = Student.VALID_GRADES
+    created = datetime(2024, 1, 1).isoformat()
+    records = {}
+    for i in range(count):
+        sid = f"STU{i:07d}"
+        records[sid] = {
+            'student_id': sid,
+            'name': f"Student {i}",
+            'email': f"student{i}@university.edu",
+            'grades': {c: grades[(i + j) % len(grades)] for j, c in enumerate(courses[:i % 4])},
+            'created_at': created,
+        }
+    return records
+
+def time_per_call(func, repeat):
+    """Average seconds per call of func() over `repeat` calls"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat
+
+def benchmark_journal(sizes=(10_000, 100_000, 1_000_000)):
+    """Compare per-mutation latency of JSONStorage and JournalStorage"""
+    print("\n⏱️  PER-MUTATION LATENCY (add_grade)")
+    print(f"  {'Students':>10} {'JSONStorage':>14} {'JournalStorage':>16}")
+    
+    for size in sizes:
+        records = make_records(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            for storage, repeat in [
+                (JSONStorage(os.path.join(tmp, 'students.json')), 3),
+                (JournalStorage(os.path.join(tmp, 'students.journal')), 1000),
+            ]:
+                storage.save(records)
+                manager = StudentManager(storage)
+                latency = time_per_call(
+                    lambda i: manager.add_grade(f"STU{i % size:07d}", 'Benchmark', 'A'), repeat)
+                manager.close()
+                results.append(latency)
+        print(f"  {size:>10,} {results[0] * 1000:>12.2f}ms {results[1] * 1000:>14.3f}ms")
+
+def benchmark_snapshot(sizes=(100_000, 1_000_000)):
+    """Compare time from opening a lazy roster to answering the first lookup"""
+    print("\n⏱️  COLD START (open roster + first get_student)")
+    print(f"  {'Students':>10} {'JSONStorage':>14} {'SnapshotStorage':>17}")
+    
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            storages = [JSONStorage(os.path.join(tmp, 'students.json')),
+                        SnapshotStorage(os.path.join(tmp, 'students.snap'))]
+            records = make_records(size)
+            for storage in storages:
+                storage.save(records)
+            del records
+            
+            results = []
+            for storage in storages:
+                # A real cold start has no big roster in memory for the GC to walk
+                gc.collect()
+                start = time.perf_counter()
+                manager = StudentManager(storage, lazy=True, trusted=True)
+                manager.get_student(f"STU{size // 2:07d}")
+                results.append(time.perf_counter() - start)
+                manager.close()
+                del manager
+        print(f"  {size:>10,} {results[0] * 1000:>12.1f}ms {results[1] * 1000:>15.2f}ms")
+
+def benchmark_incremental(sizes=(500_000,)):
+    """Compare CPU time per save of a full JSON rewrite and a spliced one"""
+    class FullRewrite(JSONStorage):
+        save_changes = Storage.save_changes
+    
+    print("\n⏱️  CPU TIME PER SAVE (one add_grade)")
+    print(f"  {'Students':>10} {'Full rewrite':>14} {'Spliced':>10}")
+    
+    for size in sizes:
+        records = make_records(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            for storage, repeat in [(FullRewrite(os.path.join(tmp, 'full.json')), 3),
+                                    (JSONStorage(os.path.join(tmp, 'spliced.json')), 20)]:
+                storage.save(records)
+                manager = StudentManager(storage, trusted=True)
+                start = time.process_time()
+                for i in range(repeat):
+                    manager.add_grade(f"STU{i * 7919 % size:07d}", 'Benchmark', 'A')
+                results.append((time.process_time() - start) / repeat)
+                manager.close()
+        print(f"  {size:>10,} {results[0] * 1000:>12.0f}ms {results[1] * 1000:>8.0f}ms")
+
+def benchmark_fuzzy(sizes=(1_000_000,)):
+    """Fuzzy name search latency on a roster of realistic, varied names"""
+    first_names = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+                   'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+                   'Thomas', 'Sarah', 'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa']
+    syllables = ['an', 'ber', 'cal', 'dor', 'el', 'fen', 'gar', 'hol', 'in', 'jor', 'kel', 'lan',
+                 'mor', 'nor', 'ost', 'par', 'quin', 'ros', 'sten', 'tor', 'ul', 'ver', 'wick', 'zel']
+    
+    def typo(word, rng):
+        i = rng.randrange(len(word))
+        return word[:i] + rng.choice('aeiourst') + word[i + 1:]
+    
+    print("\n⏱️  FUZZY SEARCH (two words, one typo in each)")
+    print(f"  {'Students':>10} {'Index build':>12} {'Per search':>12} {'Avg results':>12}")
+    for size in sizes:
+        rng = random.Random(42)
+        records = make_records(size)
+        for record in records.values():
+            surname = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+            record['name'] = f"{rng.choice(first_names)} {surname.title()}"
+        manager = StudentManager(MemoryStorage(), trusted=True)
+        manager.students = {sid: Student.from_dict(r, trusted=True) for sid, r in records.items()}
+        
+        start = time.perf_counter()
+        manager.search('warm up', fuzzy=True)
+        build = time.perf_counter() - start
+        
+        names = [r['name'] for r in rng.sample(list(records.values()), 200)]
+        queries = [' '.join(typo(w, rng) for w in name.split()) for name in names]
+        found = []
+        latency = time_per_call(lambda i: found.append(len(manager.search(queries[i], fuzzy=True))),
+                                len(queries))
+        print(f"  {size:>10,} {build:>11.1f}s {latency * 1000:>10.2f}ms {sum(found) / len(found):>12.1f}")
+
+def benchmark_sqlite(sizes=(1_000_000,)):
+    """Compare startup time and query latency of JSONStorage and SQLiteStorage"""
+    for size in sizes:
+        records = make_records(size)
+        probe = f"STU{size // 2:07d}"
+        queries = [
+            ('get_student', lambda m: m.get_student(probe)),
+            ('search', lambda m: m.search(f"student {size // 3}")),
+            ('get_by_gpa', lambda m: m.get_by_gpa(3.6, 3.7)),
+        ]
+        
+        print(f"\n⏱️  {size:,} STUDENTS")
+        print(f"  {'':<14} {'JSONStorage':>14} {'SQLiteStorage':>14}")
+        with tempfile.TemporaryDirectory() as tmp:
+            columns = []
+            for storage in [JSONStorage(os.path.join(tmp, 'students.json')),
+                            SQLiteStorage(os.path.join(tmp, 'students.db'))]:
+                storage.save(records)
+                start = time.perf_counter()
+                manager = StudentManager(storage)
+                timings = [time.perf_counter() - start]
+                for _, query in queries:
+                    start = time.perf_counter()
+                    query(manager)
+                    timings.append(time.perf_counter() - start)
+                manager.close()
+                columns.append(timings)
+        
+        for row, name in enumerate(['startup'] + [name for name, _ in queries]):
+            print(f"  {name:<14} {columns[0][row] * 1000:>12.2f}ms {columns[1][row] * 1000:>12.2f}ms")
+
+def benchmark_memory(sizes=(1_000_000,)):
+    """Compare the memory used by Student and CompactStudent rosters"""
+    print("\n⏱️  ROSTER MEMORY (tracemalloc)")
+    print(f"  {'Students':>10} {'Student':>18} {'CompactStudent':>18}")
+    
+    for size in sizes:
+        records = make_records(size)
+        results = []
+        for cls in (Student, CompactStudent):
+            tracemalloc.start()
+            students = {}
+            for record in records.values():
+                student = cls.from_dict(record)
+                students[student.student_id] = student
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del students
+            results.append(used)
+        cells = [f"{used / 2**20:.1f}MB ({used // size}B)" for used in results]
+        print(f"  {size:>10,} {cells[0]:>18} {cells[1]:>18}")
+
+def benchmark_sharded(sizes=(1_000_000,)):
+    """Measure ShardedStorage load time as worker processes are added"""
+    cores = os.cpu_count()
+    shards = max(8, cores)
+    workers = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    
+    for size in sizes:
+        records = make_records(size)
+        print(f"\n⏱️  LOAD TIME, {size:,} STUDENTS, {shards} SHARDS")
+        with tempfile.TemporaryDirectory() as tmp:
+            single = JSONStorage(os.path.join(tmp, 'students.json'))
+            single.save(records)
+            start = time.perf_counter()
+            single.load()
+            baseline = time.perf_counter() - start
+            print(f"  {'JSONStorage':<16} {baseline:>8.2f}s")
+            
+            ShardedStorage(os.path.join(tmp, 'shards'), shards=shards).save(records)
+            for count in workers:
+                storage = ShardedStorage(os.path.join(tmp, 'shards'), shards=shards, workers=count)
+                start = time.perf_counter()
+                storage.load()
+                elapsed = time.perf_counter() - start
+                print(f"  {f'{count} worker(s)':<16} {elapsed:>8.2f}s  ({baseline / elapsed:.1f}x)")
+
+def benchmark_threads(sizes=(100_000,), duration=1.0):
+    """Throughput of ThreadSafeStudentManager under mixed read/write load"""
+    for size in sizes:
+        print(f"\n⏱️  OPS/SECOND, {size:,} STUDENTS ({duration:g}s per cell)")
+        print(f"  {'Threads':>8} {'99% reads':>12} {'90% reads':>12} {'50% reads':>12}")
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = JournalStorage(os.path.join(tmp, 'students.journal'))
+            storage.save(make_records(size))
+            manager = ThreadSafeStudentManager(storage)
+            manager.search('warm up')
+            
+            for threads in (1, 2, 4, 8):
+                cells = []
+                for read_ratio in (0.99, 0.9, 0.5):
+                    counts = [0] * threads
+                    deadline = time.perf_counter() + duration
+                    
+                    def worker(n):
+                        rng = random.Random(n)
+                        while time.perf_counter() < deadline:
+                            sid = f"STU{rng.randrange(size):07d}"
+                            if rng.random() < read_ratio:
+                                manager.search(f"student {sid[-5:]}")
+                            else:
+                                manager.add_grade(sid, 'Benchmark', rng.choice(Student.VALID_GRADES))
+                            counts[n] += 1
+                    
+                    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+                    for t in pool:
+                        t.start()
+                    for t in pool:
+                        t.join()
+                    cells.append(sum(counts) / duration)
+                print(f"  {threads:>8} " + " ".join(f"{ops:>12,.0f}" for ops in cells))
+            manager.close()
+
+def benchmark_http(sizes=(100_000,)):
+    """Load-test the HTTP API against an in-process server"""
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = JournalStorage(os.path.join(tmp, 'students.journal'))
+            records = make_records(size)
+            storage.save(records)
+            manager = ThreadSafeStudentManager(storage)
+            manager.search('warm up')
+            
+            server = StudentServer(manager, port=0, verbose=False)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            print(f"\n⏱️  {size:,} STUDENTS")
+            load_test('127.0.0.1', server.server_port, list(records))
+            server.shutdown()
+            server.server_close()
+            manager.close()
+
+def benchmarks():
+    """Pick and run a benchmark"""
+    options = {
+        '1': ('Journal vs JSON storage', benchmark_journal),
+        '2': ('SQLite vs JSON storage', benchmark_sqlite),
+        '3': ('Student vs CompactStudent memory', benchmark_memory),
+        '4': ('Sharded storage load scaling', benchmark_sharded),
+        '5': ('Thread-safe manager throughput', benchmark_threads),
+        '6': ('HTTP API load test', benchmark_http),
+        '7': ('Snapshot vs JSON cold start', benchmark_snapshot),
+        '8': ('Incremental JSON saves', benchmark_incremental),
+        '9': ('Fuzzy name search', benchmark_fuzzy),
+    }
+    print("\n⏱️  BENCHMARKS")
+    for key, (desc, _) in options.items():
+        print(f"  {key}. {desc}")
+    choice = input("\nChoice: ").strip()
+    if choice not in options:
+        print("\n❌ Invalid choice")
+        return
+    
+    sizes = input("Roster sizes (comma separated, Enter for defaults): ").strip()
+    _, bench = options[choice]
+    if sizes:
+        bench(tuple(int(x) for x in sizes.split(',')))
+    else:
+        bench()
+
 # Run demo or CLI
 if __name__ == "__main__":
     print("\n1. Run Demo")
     print("2. Run Interactive CLI")
-    choice = input("\nChoice (1/2): ").strip()
+    print("3. Run Benchmarks")
+    print("4. Run HTTP API Server")
+    choice = input("\nChoice (1/2/3/4): ").strip()
     
     if choice == "2":
-        # Use JSON storage for persistence
-        manager = StudentManager(JSONStorage("students.json"))
+        # Use JSON storage for persistence; only hydrate the students we look at
+        manager = StudentManager(JSONStorage("students.json"), lazy=True, trusted=True)
         cli = StudentCLI(manager)
         cli.run()
+        manager.close()
+    elif choice == "3":
+        benchmarks()
+    elif choice == "4":
+        manager = ThreadSafeStudentManager(JSONStorage("students.json"), trusted=True)
+        serve(manager)
+        manager.close()
     else:
         demo()
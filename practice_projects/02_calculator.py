@@ -1,10 +1,27 @@
 # PRACTICE PROJECT: Scientific Calculator
 # Demonstrates: OOP, operator overloading, exception handling, math functions
 
+import argparse
 import math
+import operator
 import re
+import sys
+import time
+import timeit
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from decimal import Decimal, localcontext
+from fractions import Fraction
 from functools import reduce
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # Optional: evaluate_many falls back to pure Python
+    np = None
 
 # ============================================================================
 # EXCEPTIONS
@@ -32,80 +49,230 @@ class InvalidOperationError(CalculatorError):
             message += f" ({reason})"
         super().__init__(message)
 
+class UndefinedVariableError(CalculatorError):
+    """Variable used in an expression without a value"""
+    def __init__(self, name):
+        super().__init__(f"Undefined variable: {name}")
+
+# ============================================================================
+# NUMERIC BACKENDS
+# ============================================================================
+
+class NumericBackend(ABC):
+    """How Number stores its value: float for speed, Decimal or Fraction for exactness"""
+    
+    @property
+    @abstractmethod
+    def name(self):
+        pass
+    
+    @property
+    @abstractmethod
+    def type(self):
+        """Python type of the values"""
+        pass
+    
+    @abstractmethod
+    def coerce(self, value):
+        """Convert an int, float, numeric string or another backend's value"""
+        pass
+    
+    def format(self, value):
+        if value == int(value):
+            return str(int(value))
+        return str(round(value, 10))
+
+class FloatBackend(NumericBackend):
+    name = "float"
+    type = float
+    coerce = staticmethod(float)
+
+class DecimalBackend(NumericBackend):
+    """Decimal arithmetic with the decimal module's context (28 digits by
+    default). Floats are read through their shortest repr, so 0.1 stays 0.1."""
+    
+    name = "decimal"
+    type = Decimal
+    
+    def coerce(self, value):
+        if isinstance(value, float):
+            return Decimal(repr(value))
+        if isinstance(value, Fraction):
+            return Decimal(value.numerator) / value.denominator
+        return Decimal(value)
+    
+    def format(self, value):
+        if value == int(value):
+            try:
+                return str(int(value))
+            except ValueError:
+                # More digits than Python converts to a string: show 1E+5000
+                return str(value.normalize())
+        # Rounding to 10 places needs room for every integer digit too
+        with localcontext() as context:
+            context.prec = max(context.prec, value.adjusted() + 11)
+            return str(round(value, 10).normalize())  # No trailing zeros
+
+class FractionBackend(NumericBackend):
+    """Exact rational arithmetic. Irrational results (sqrt, sin, non-integer
+    powers) are computed in float and converted back."""
+    
+    name = "fraction"
+    type = Fraction
+    
+    def coerce(self, value):
+        if isinstance(value, float):
+            return Fraction(repr(value))
+        return Fraction(value)
+    
+    def format(self, value):
+        try:
+            if value.denominator == 1:
+                return str(value.numerator)
+            return str(value)
+        except ValueError:
+            # More digits than Python converts to a string: show 1E+5000
+            return str((Decimal(value.numerator) / value.denominator).normalize())
+
 # ============================================================================
 # NUMBER CLASS WITH OPERATOR OVERLOADING
 # ============================================================================
 
 class Number:
-    """Custom number class demonstrating operator overloading"""
+    """Custom number class demonstrating operator overloading.
+    
+    The value is stored as the current backend's type (float by default).
+    Number-with-Number operations skip __init__ when both values already
+    have that type; values left over from another backend are converted.
+    """
+    
+    __slots__ = ('_value',)
+    
+    BACKENDS = {backend.name: backend for backend in (FloatBackend(), DecimalBackend(), FractionBackend())}
+    backend = BACKENDS['float']
+    _type = float  # backend.type, kept here for the fast paths
     
     def __init__(self, value):
         if isinstance(value, Number):
             self._value = value._value
         else:
-            self._value = float(value)
+            self._value = self.backend.coerce(value)
+    
+    @classmethod
+    def set_backend(cls, name):
+        """Switch the backend; existing Numbers are converted as they are used"""
+        if name not in cls.BACKENDS:
+            raise InvalidOperationError("Backend", f"Unknown backend '{name}'")
+        cls.backend = cls.BACKENDS[name]
+        cls._type = cls.backend.type
+    
+    @staticmethod
+    def _of(value):
+        """Wrap a value that already has the backend's type"""
+        number = object.__new__(Number)
+        number._value = value
+        return number
+    
+    def _current(self):
+        """The value as the current backend's type; a Number created before
+        a backend switch still holds the old type"""
+        value = self._value
+        return value if type(value) is self._type else self.backend.coerce(value)
+    
+    def _operands(self, other):
+        other_val = other._current() if isinstance(other, Number) else self.backend.coerce(other)
+        return self._current(), other_val
     
     @property
     def value(self):
-        return self._value
+        return self._current()
     
     # Arithmetic operators
     def __add__(self, other):
-        if isinstance(other, Number):
-            return Number(self._value + other._value)
-        return Number(self._value + other)
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            return Number._of(self._value + other._value)
+        a, b = self._operands(other)
+        return Number._of(a + b)
     
     def __radd__(self, other):
-        return Number(other + self._value)
+        a, b = self._operands(other)
+        return Number._of(b + a)
     
     def __sub__(self, other):
-        if isinstance(other, Number):
-            return Number(self._value - other._value)
-        return Number(self._value - other)
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            return Number._of(self._value - other._value)
+        a, b = self._operands(other)
+        return Number._of(a - b)
     
     def __rsub__(self, other):
-        return Number(other - self._value)
+        a, b = self._operands(other)
+        return Number._of(b - a)
     
     def __mul__(self, other):
-        if isinstance(other, Number):
-            return Number(self._value * other._value)
-        return Number(self._value * other)
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            return Number._of(self._value * other._value)
+        a, b = self._operands(other)
+        return Number._of(a * b)
     
     def __rmul__(self, other):
-        return Number(other * self._value)
+        a, b = self._operands(other)
+        return Number._of(b * a)
     
     def __truediv__(self, other):
-        other_val = other._value if isinstance(other, Number) else other
-        if other_val == 0:
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            a, b = self._value, other._value
+        else:
+            a, b = self._operands(other)
+        if b == 0:
             raise DivisionByZeroError()
-        return Number(self._value / other_val)
+        return Number._of(a / b)
     
     def __rtruediv__(self, other):
-        if self._value == 0:
+        a, b = self._operands(other)
+        if a == 0:
             raise DivisionByZeroError()
-        return Number(other / self._value)
+        return Number._of(b / a)
     
     def __floordiv__(self, other):
-        other_val = other._value if isinstance(other, Number) else other
-        if other_val == 0:
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            a, b = self._value, other._value
+        else:
+            a, b = self._operands(other)
+        if b == 0:
             raise DivisionByZeroError()
-        return Number(self._value // other_val)
+        quotient = a // b
+        if type(a) is Decimal and a % b and (a < 0) != (b < 0):
+            quotient -= 1  # Decimal truncates; float and Fraction floor
+        return Number(quotient)
     
     def __mod__(self, other):
-        other_val = other._value if isinstance(other, Number) else other
-        if other_val == 0:
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            a, b = self._value, other._value
+        else:
+            a, b = self._operands(other)
+        if b == 0:
             raise DivisionByZeroError()
-        return Number(self._value % other_val)
+        remainder = a % b
+        if type(a) is Decimal and remainder and (remainder < 0) != (b < 0):
+            remainder += b  # Take the divisor's sign, as float and Fraction do
+        return Number._of(remainder)
     
     def __pow__(self, other):
-        other_val = other._value if isinstance(other, Number) else other
-        return Number(self._value ** other_val)
+        if type(other) is Number and type(self._value) is type(other._value) is self._type:
+            a, b = self._value, other._value
+        else:
+            a, b = self._operands(other)
+        # Through __init__: Fraction ** non-integer gives a float
+        return Number(a ** b)
     
     def __neg__(self):
-        return Number(-self._value)
+        return Number._of(-self._current())
     
     def __abs__(self):
-        return Number(abs(self._value))
+        return Number._of(abs(self._current()))
+    
+    def __float__(self):
+        return float(self._value)
     
     # Comparison operators
     def __eq__(self, other):
@@ -130,17 +297,33 @@ class Number:
     
     # String representations
     def __str__(self):
-        if self._value == int(self._value):
-            return str(int(self._value))
-        return str(round(self._value, 10))
+        return self.backend.format(self._current())
     
     def __repr__(self):
         return f"Number({self._value})"
 
+def as_number(value):
+    """value as a Number, without copying one that already is"""
+    return value if type(value) is Number else Number(value)
+
+def is_finite(value):
+    """False for the inf/nan results float and Decimal arithmetic can give"""
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, Decimal):
+        return value.is_finite()
+    return True
+
 # ============================================================================
 # OPERATIONS
 # ============================================================================
 
+def finite_or_nan(column):
+    """Replace inf results with nan, so every undefined row reads the same"""
+    if np is not None and isinstance(column, np.ndarray):
+        return np.where(np.isfinite(column), column, np.nan)
+    return array('d', (x if math.isfinite(x) else math.nan for x in column))
+
 class Operation(ABC):
     """Abstract base class for operations"""
     
@@ -158,6 +341,21 @@ class Operation(ABC):
     def execute(self, *args):
         pass
     
+    def execute_many(self, *columns):
+        """Apply element-wise to equal-length float columns. Rows without a
+        defined result (division by zero, domain errors, overflow) are nan."""
+        results = array('d')
+        for row in zip(*columns):
+            try:
+                results.append(float(self.execute(*row)))
+            except (CalculatorError, ArithmeticError, ValueError, TypeError):
+                results.append(math.nan)
+        return finite_or_nan(results)
+    
+    def execute_array(self, *columns):
+        """NumPy version of execute_many; operations override this with ufuncs"""
+        return np.array(self.execute_many(*columns))
+    
     @property
     def arity(self):
         """Number of arguments required"""
@@ -183,42 +381,79 @@ class Add(BinaryOperation):
     symbol = "+"
     
     def execute(self, a, b):
-        return Number(a) + Number(b)
+        return as_number(a) + as_number(b)
+    
+    def execute_many(self, a, b):
+        return finite_or_nan(map(operator.add, a, b))
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.add(a, b))
 
 class Subtract(BinaryOperation):
     name = "Subtract"
     symbol = "-"
     
     def execute(self, a, b):
-        return Number(a) - Number(b)
+        return as_number(a) - as_number(b)
+    
+    def execute_many(self, a, b):
+        return finite_or_nan(map(operator.sub, a, b))
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.subtract(a, b))
 
 class Multiply(BinaryOperation):
     name = "Multiply"
     symbol = "×"
     
     def execute(self, a, b):
-        return Number(a) * Number(b)
+        return as_number(a) * as_number(b)
+    
+    def execute_many(self, a, b):
+        return finite_or_nan(map(operator.mul, a, b))
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.multiply(a, b))
 
 class Divide(BinaryOperation):
     name = "Divide"
     symbol = "÷"
     
     def execute(self, a, b):
-        return Number(a) / Number(b)
+        return as_number(a) / as_number(b)
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.divide(a, b))
 
 class Power(BinaryOperation):
     name = "Power"
     symbol = "^"
     
     def execute(self, a, b):
-        return Number(a) ** Number(b)
+        return as_number(a) ** as_number(b)
+    
+    def execute_many(self, a, b):
+        results = array('d')
+        for x, y in zip(a, b):
+            try:
+                value = x ** y
+            except (ZeroDivisionError, OverflowError):
+                value = math.nan
+            results.append(value if isinstance(value, float) else math.nan)  # Complex root
+        return finite_or_nan(results)
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.power(a, b))
 
 class Modulo(BinaryOperation):
     name = "Modulo"
     symbol = "%"
     
     def execute(self, a, b):
-        return Number(a) % Number(b)
+        return as_number(a) % as_number(b)
+    
+    def execute_array(self, a, b):
+        return finite_or_nan(np.mod(a, b))
 
 # Unary Operations
 class SquareRoot(UnaryOperation):
@@ -230,6 +465,12 @@ class SquareRoot(UnaryOperation):
         if val < 0:
             raise InvalidOperationError("Square root", "Cannot compute for negative numbers")
         return Number(math.sqrt(val))
+    
+    def execute_many(self, a):
+        return array('d', (math.sqrt(x) if x >= 0 else math.nan for x in a))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.sqrt(a))
 
 class Factorial(UnaryOperation):
     name = "Factorial"
@@ -250,6 +491,9 @@ class Sine(UnaryOperation):
     def execute(self, a):
         val = float(a._value if isinstance(a, Number) else a)
         return Number(math.sin(math.radians(val)))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.sin(np.radians(a)))
 
 class Cosine(UnaryOperation):
     name = "Cosine"
@@ -258,6 +502,9 @@ class Cosine(UnaryOperation):
     def execute(self, a):
         val = float(a._value if isinstance(a, Number) else a)
         return Number(math.cos(math.radians(val)))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.cos(np.radians(a)))
 
 class Tangent(UnaryOperation):
     name = "Tangent"
@@ -266,6 +513,9 @@ class Tangent(UnaryOperation):
     def execute(self, a):
         val = float(a._value if isinstance(a, Number) else a)
         return Number(math.tan(math.radians(val)))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.tan(np.radians(a)))
 
 class Log(UnaryOperation):
     name = "Log (base 10)"
@@ -276,6 +526,9 @@ class Log(UnaryOperation):
         if val <= 0:
             raise InvalidOperationError("Logarithm", "Cannot compute for non-positive numbers")
         return Number(math.log10(val))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.log10(a))
 
 class NaturalLog(UnaryOperation):
     name = "Natural Log"
@@ -286,6 +539,22 @@ class NaturalLog(UnaryOperation):
         if val <= 0:
             raise InvalidOperationError("Natural Log", "Cannot compute for non-positive numbers")
         return Number(math.log(val))
+    
+    def execute_array(self, a):
+        return finite_or_nan(np.log(a))
+
+class Negate(UnaryOperation):
+    name = "Negate"
+    symbol = "-"
+    
+    def execute(self, a):
+        return -as_number(a)
+    
+    def execute_many(self, a):
+        return array('d', map(operator.neg, a))
+    
+    def execute_array(self, a):
+        return np.negative(a)
 
 # ============================================================================
 # MEMORY
@@ -309,12 +578,21 @@ class Memory:
     
     def add(self, value):
         """Add to memory"""
-        self._value = self._value + Number(value)
-        return self._value
+        return self._update('m+', operator.add, value)
     
     def subtract(self, value):
         """Subtract from memory"""
-        self._value = self._value - Number(value)
+        return self._update('m-', operator.sub, value)
+    
+    def _update(self, command, operation, value):
+        # Memory keeps its old value if the result would overflow
+        try:
+            result = operation(self._value, Number(value))
+        except ArithmeticError:
+            result = None
+        if result is None or not is_finite(result.value):
+            raise InvalidOperationError(command, "Result out of range")
+        self._value = result
         return self._value
     
     def clear(self):
@@ -336,6 +614,300 @@ class Memory:
         """Clear history"""
         self._history.clear()
 
+# ============================================================================
+# EXPRESSION PARSER
+# ============================================================================
+
+class Tokenizer:
+    """Splits an expression into (kind, text) tokens in one left-to-right pass"""
+    
+    PATTERN = re.compile(r"""
+        \s*(?:
+            (?P<number>(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)
+          | (?P<name>[a-z_][a-z0-9_]*|π|√)
+          | (?P<op>\*\*|[-+*/×÷^%!()])
+          | (?P<error>\S)
+        )""", re.VERBOSE)
+    
+    def tokenize(self, text):
+        for match in self.PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == 'error':
+                raise InvalidExpressionError(text)
+            yield kind, match.group(kind)
+        yield 'end', ''
+
+class Node(ABC):
+    """Node of a parsed expression"""
+    
+    children = ()
+    
+    @abstractmethod
+    def evaluate(self, calculator, *args):
+        """Value of this node. Leaves get the variable bindings; operations
+        get the values of their children."""
+        pass
+
+class Constant(Node):
+    """A number or named constant"""
+    
+    def __init__(self, value):
+        self.value = Number(value)
+    
+    def evaluate(self, calculator, variables):
+        return self.value
+
+class Answer(Node):
+    """'ans' - the calculator's last result at evaluation time"""
+    
+    def evaluate(self, calculator, variables):
+        return calculator.last_result
+
+class MemoryRecall(Node):
+    """'mem' - the value in memory at evaluation time"""
+    
+    def evaluate(self, calculator, variables):
+        return calculator.memory.recall()
+
+class Variable(Node):
+    """A named variable, bound per evaluation or assigned on the calculator"""
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def evaluate(self, calculator, variables):
+        if self.name in variables:
+            return Number(variables[self.name])
+        if self.name in calculator.variables:
+            return calculator.variables[self.name]
+        raise UndefinedVariableError(self.name)
+
+class Apply(Node):
+    """An operation applied to the values of its children"""
+    
+    def __init__(self, op, *children):
+        self.op = op
+        self.children = children
+    
+    def evaluate(self, calculator, *args):
+        return self.op.execute(*args)
+
+class Parser:
+    """Precedence-climbing (Pratt) parser from tokens to an expression tree"""
+    
+    # Binding power: higher binds tighter
+    BINARY_POWER = {'+': 10, '-': 10, '*': 20, '×': 20, '/': 20, '÷': 20, '%': 20, '^': 30, '**': 30}
+    RIGHT_ASSOCIATIVE = {'^', '**'}
+    PREFIX_POWER = 25  # Unary minus: -2^2 is -(2^2), but 2*-3 works
+    CALL_POWER = 40  # Unparenthesized function argument: sqrt 16^2 is (sqrt 16)^2
+    POSTFIX_POWER = 50  # Factorial
+    NEGATE = Negate()
+    
+    def __init__(self, calculator):
+        self.binary_ops = calculator.BINARY_OPS
+        self.unary_ops = calculator.UNARY_OPS
+        self.constants = calculator.CONSTANTS
+        self.tokenizer = Tokenizer()
+    
+    def parse(self, text):
+        """Parse text into a tree; raise InvalidExpressionError if it isn't valid"""
+        self._text = text
+        self._tokens = self.tokenizer.tokenize(text.lower())
+        self._advance()
+        try:
+            tree = self._expression(0)
+        except RecursionError:
+            raise InvalidExpressionError(text)  # Nested too deeply
+        if self._kind != 'end':
+            self._fail()
+        return tree
+    
+    def _advance(self):
+        self._kind, self._value = next(self._tokens)
+    
+    def _fail(self):
+        raise InvalidExpressionError(self._text)
+    
+    def _expression(self, right_power):
+        kind, value = self._kind, self._value
+        if kind == 'end':
+            self._fail()
+        self._advance()
+        left = self._prefix(kind, value)
+        
+        while self._kind == 'op':
+            op = self._value
+            if op == '!':
+                if self.POSTFIX_POWER <= right_power:
+                    break
+                self._advance()
+                left = Apply(self.unary_ops['!'], left)
+            elif op in self.BINARY_POWER:
+                power = self.BINARY_POWER[op]
+                if power <= right_power:
+                    break
+                self._advance()
+                right = self._expression(power - 1 if op in self.RIGHT_ASSOCIATIVE else power)
+                left = Apply(self.binary_ops[op], left, right)
+            else:
+                break
+        return left
+    
+    def _prefix(self, kind, value):
+        if kind == 'number':
+            return Constant(value)  # From the text, so exact backends stay exact
+        if kind == 'op':
+            if value == '(':
+                return self._group()
+            if value == '-':
+                return Apply(self.NEGATE, self._expression(self.PREFIX_POWER))
+            if value == '+':
+                return self._expression(self.PREFIX_POWER)
+        if kind == 'name':
+            if value == 'ans':
+                return Answer()
+            if value == 'mem':
+                return MemoryRecall()
+            if value in self.constants:
+                return Constant(self.constants[value])
+            if value in self.unary_ops:
+                # A parenthesized argument ends at its ')', so sqrt(4)! is (sqrt 4)!
+                if (self._kind, self._value) == ('op', '('):
+                    self._advance()
+                    argument = self._group()
+                else:
+                    argument = self._expression(self.CALL_POWER)
+                return Apply(self.unary_ops[value], argument)
+            return Variable(value)
+        self._fail()
+    
+    def _group(self):
+        """The rest of a parenthesized expression, after its '('"""
+        inner = self._expression(0)
+        if (self._kind, self._value) != ('op', ')'):
+            self._fail()
+        self._advance()
+        return inner
+
+class Expression:
+    """A compiled expression. The tree is flattened to postfix order once, so
+    evaluating is a loop over a stack rather than recursion. 'ans' and 'mem'
+    are looked up on every evaluation, so one Expression can be reused."""
+    
+    def __init__(self, text, tree):
+        self.text = text
+        self.tree = tree
+        self._program = self._flatten(tree)
+    
+    @staticmethod
+    def _flatten(tree):
+        program = []
+        pending = [(tree, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if expanded or not node.children:
+                program.append(node)
+            else:
+                pending.append((node, True))
+                pending.extend((child, False) for child in reversed(node.children))
+        return program
+    
+    @property
+    def variables(self):
+        """Names of the variables the expression uses"""
+        return {node.name for node in self._program if isinstance(node, Variable)}
+    
+    @property
+    def stateful(self):
+        """Whether the result depends on 'ans' or 'mem'"""
+        return any(isinstance(node, (Answer, MemoryRecall)) for node in self._program)
+    
+    def evaluate(self, calculator, variables=None):
+        variables = variables or {}
+        values = []
+        for node in self._program:
+            count = len(node.children)
+            if count:
+                args = values[-count:]
+                del values[-count:]
+                values.append(node.evaluate(calculator, *args))
+            else:
+                values.append(node.evaluate(calculator, variables))
+        return values[0]
+    
+    def evaluate_many(self, calculator, columns, length):
+        """Evaluate once per row of the columns (arrays of equal length). Each
+        operation runs over whole columns: NumPy ufuncs if the columns are
+        ndarrays, otherwise a pure-Python loop."""
+        vectorized = np is not None and all(isinstance(c, np.ndarray) for c in columns.values())
+        values = []
+        # Undefined rows become nan, so NumPy's warnings about them are noise
+        with np.errstate(all='ignore') if vectorized else nullcontext():
+            for node in self._program:
+                count = len(node.children)
+                if count:
+                    args = values[-count:]
+                    del values[-count:]
+                    if vectorized:
+                        values.append(node.op.execute_array(*args))
+                    else:
+                        values.append(node.op.execute_many(*args))
+                elif isinstance(node, Variable) and node.name in columns:
+                    values.append(columns[node.name])
+                else:
+                    # Constants, ans, mem and assigned variables are the same on every row
+                    value = float(node.evaluate(calculator, {}))
+                    values.append(np.full(length, value) if vectorized else array('d', [value]) * length)
+        return values[0]
+
+class ExpressionCache:
+    """Bounded LRU cache of compiled expressions"""
+    
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def normalize(text):
+        """Cache key: lowercase with whitespace runs collapsed"""
+        return ' '.join(text.lower().split())
+    
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    
+    def put(self, key, expression):
+        if self.capacity <= 0:
+            return
+        self._entries[key] = expression
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
 # ============================================================================
 # CALCULATOR
 # ============================================================================
@@ -374,9 +946,13 @@ class Calculator:
         'phi': (1 + math.sqrt(5)) / 2,  # Golden ratio
     }
     
-    def __init__(self):
+    def __init__(self, cache_size=256):
         self.memory = Memory()
         self._last_result = Number(0)
+        self._parser = Parser(self)
+        self.cache = ExpressionCache(cache_size)
+        self.variables = {}
+        self.record_history = True
     
     @property
     def last_result(self):
@@ -406,67 +982,85 @@ class Calculator:
         
         return result
     
-    def evaluate_expression(self, expression):
-        """Evaluate a mathematical expression string"""
-        # Replace constants
-        expr = expression.lower()
-        for name, value in self.CONSTANTS.items():
-            expr = expr.replace(name, str(value))
-        
-        # Replace 'ans' with last result
-        expr = expr.replace('ans', str(self._last_result))
-        
-        # Handle unary functions: sin(x), cos(x), etc.
-        for func_name in ['sqrt', 'sin', 'cos', 'tan', 'log', 'ln']:
-            pattern = rf'{func_name}\(([^)]+)\)'
-            while re.search(pattern, expr):
-                match = re.search(pattern, expr)
-                if match:
-                    inner = match.group(1)
-                    try:
-                        inner_val = self._safe_eval(inner)
-                        result = self.UNARY_OPS[func_name].execute(inner_val)
-                        expr = expr[:match.start()] + str(result) + expr[match.end():]
-                    except Exception as e:
-                        raise InvalidExpressionError(expression)
-        
-        # Handle factorial: 5!
-        while '!' in expr:
-            pattern = r'(\d+)!'
-            match = re.search(pattern, expr)
-            if match:
-                num = int(match.group(1))
-                result = self.UNARY_OPS['!'].execute(num)
-                expr = expr[:match.start()] + str(result) + expr[match.end():]
-            else:
-                break
-        
-        # Handle power with ^
-        expr = expr.replace('^', '**')
-        
-        # Evaluate remaining expression
+    def compile(self, expression):
+        """Compile an expression string into a reusable Expression (cached)"""
+        key = ExpressionCache.normalize(expression)
+        compiled = self.cache.get(key)
+        if compiled is None:
+            compiled = Expression(expression, self._parser.parse(expression))
+            self.cache.put(key, compiled)
+        return compiled
+    
+    def evaluate(self, expression, variables=None):
+        """Evaluate an expression without updating ans or history"""
+        compiled = expression if isinstance(expression, Expression) else self.compile(expression)
+        variables = {name.lower(): value for name, value in (variables or {}).items()}
         try:
-            result = Number(self._safe_eval(expr))
-            self._last_result = result
-            self.memory.add_to_history(expression, result)
-            return result
+            result = compiled.evaluate(self, variables)
         except ZeroDivisionError:
             raise DivisionByZeroError()
-        except Exception:
-            raise InvalidExpressionError(expression)
-    
-    def _safe_eval(self, expr):
-        """Safely evaluate a mathematical expression"""
-        # Only allow numbers, operators, and parentheses
-        allowed = set('0123456789.+-*/()** ')
-        expr_check = expr.replace(' ', '')
+        except (ArithmeticError, ValueError, TypeError):
+            # Overflow, or a complex result such as (-8)^(1/3)
+            raise InvalidExpressionError(compiled.text)
         
-        # Check for any remaining letters (functions not replaced)
-        if re.search(r'[a-zA-Z]', expr_check):
-            raise InvalidExpressionError(expr)
+        # Float overflow gives inf rather than raising, e.g. 1e308 * 10 or 1e999
+        if not is_finite(result.value):
+            raise InvalidExpressionError(compiled.text)
+        return result
+    
+    def evaluate_expression(self, expression, /, **variables):
+        """Evaluate an expression string, or an Expression from compile().
+        Keyword arguments give values for variables, e.g. x=3."""
+        result = self.evaluate(expression, variables)
+        self._last_result = result
+        if self.record_history:
+            text = expression.text if isinstance(expression, Expression) else expression
+            self.memory.add_to_history(text, result)
+        return result
+    
+    def evaluate_many(self, expression, /, **columns):
+        """Evaluate an expression over columns of values, one result per row:
+            
+            calc.evaluate_many("sqrt(x^2 + y^2)", x=xs, y=ys)
         
-        # Evaluate
-        return eval(expr, {"__builtins__": {}}, {})
+        The expression is compiled once. With NumPy installed the result is a
+        float ndarray, otherwise an array('d'). Rows without a defined result
+        are nan instead of raising. Columns are always computed in float,
+        whatever the Number backend. Results are not added to history."""
+        compiled = expression if isinstance(expression, Expression) else self.compile(expression)
+        columns = {name.lower(): self._column(values) for name, values in columns.items()}
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise InvalidOperationError("evaluate_many", "Columns must have the same length")
+        length = lengths.pop() if lengths else 0
+        return compiled.evaluate_many(self, columns, length)
+    
+    @staticmethod
+    def _column(values):
+        if np is not None:
+            return np.asarray(values, dtype=float)
+        if isinstance(values, array) and values.typecode == 'd':
+            return values
+        return array('d', values)
+    
+    def set_backend(self, name):
+        """Switch the Number backend ('float', 'decimal' or 'fraction'). The
+        backend is process-wide; this calculator's ans, memory and variables
+        are converted to it."""
+        Number.set_backend(name)
+        self.cache.clear()  # Compiled constants hold values of the old type
+        self._last_result = Number(self._last_result.value)
+        self.memory.store(self.memory.recall().value)
+        self.variables = {key: Number(value.value) for key, value in self.variables.items()}
+    
+    def assign(self, name, expression):
+        """Evaluate an expression and store the result in a variable"""
+        name = name.lower()
+        if name in self.CONSTANTS or name in self.UNARY_OPS or name in ('ans', 'mem'):
+            raise InvalidOperationError("Assignment", f"'{name}' is a reserved name")
+        result = self.evaluate_expression(expression)
+        self.variables[name] = result
+        return result
     
     # Statistical functions
     def mean(self, numbers):
@@ -510,6 +1104,9 @@ class Calculator:
 class CalculatorCLI:
     """Interactive calculator interface"""
     
+    MEMORY_COMMANDS = ('mr', 'mc', 'ms', 'm+', 'm-')
+    ASSIGNMENT = re.compile(r'^([a-z_][a-z0-9_]*)\s*=(.+)$', re.IGNORECASE)
+    
     def __init__(self):
         self.calc = Calculator()
     
@@ -536,10 +1133,20 @@ class CalculatorCLI:
                 elif command == 'clear':
                     self.calc.memory.clear_history()
                     print("📋 History cleared")
-                elif command.startswith('m'):
+                elif command.split()[0] in self.MEMORY_COMMANDS:
                     self.handle_memory(command)
                 elif command == 'stats':
                     self.statistics_mode()
+                elif command == 'cache':
+                    self.show_cache()
+                elif command == 'vars':
+                    self.show_variables()
+                elif command.split()[0] == 'backend':
+                    self.handle_backend(command)
+                elif self.ASSIGNMENT.match(expr):
+                    name, value = self.ASSIGNMENT.match(expr).groups()
+                    result = self.calc.assign(name, value)
+                    print(f"   {name.lower()} = {result}")
                 else:
                     result = self.calc.evaluate_expression(expr)
                     print(f"   = {result}")
@@ -580,13 +1187,18 @@ class CalculatorCLI:
         print("\nMEMORY:")
         print("  ms       Memory store  mr      Memory recall")
         print("  m+       Memory add    m-      Memory subtract")
-        print("  mc       Memory clear")
+        print("  mc       Memory clear  mem     Memory value in expressions")
+        
+        print("\nVARIABLES:")
+        print("  x = 2^3  Assign        vars    Show variables")
         
         print("\nSPECIAL:")
         print("  ans      Previous result")
         print("  history  Show history")
         print("  clear    Clear history")
         print("  stats    Statistics mode")
+        print("  cache    Expression cache stats")
+        print("  backend  Show or set number backend (float, decimal, fraction)")
         print("  exit     Exit calculator")
     
     def show_history(self):
@@ -601,6 +1213,35 @@ class CalculatorCLI:
         for i, item in enumerate(history[-10:], 1):  # Last 10
             print(f"  {i}. {item['expression']} = {item['result']}")
     
+    def show_variables(self):
+        """Show assigned variables"""
+        if not self.calc.variables:
+            print("\n📝 No variables")
+            return
+        
+        print("\n📝 VARIABLES")
+        print("-" * 40)
+        for name, value in sorted(self.calc.variables.items()):
+            print(f"  {name} = {value}")
+    
+    def handle_backend(self, command):
+        """Show or switch the number backend"""
+        parts = command.split()
+        if len(parts) > 1:
+            self.calc.set_backend(parts[1])
+        print(f"   Backend: {Number.backend.name} (available: {', '.join(Number.BACKENDS)})")
+    
+    def show_cache(self):
+        """Show compiled expression cache statistics"""
+        stats = self.calc.cache.stats()
+        print("\n🗃️  EXPRESSION CACHE")
+        print("-" * 40)
+        print(f"  Entries:   {stats['size']}/{stats['capacity']}")
+        print(f"  Hits:      {stats['hits']}")
+        print(f"  Misses:    {stats['misses']}")
+        print(f"  Evictions: {stats['evictions']}")
+        print(f"  Hit rate:  {stats['hit_rate']:.1%}")
+    
     def handle_memory(self, command):
         """Handle memory commands"""
         mem = self.calc.memory
@@ -660,6 +1301,127 @@ class CalculatorCLI:
             except CalculatorError as e:
                 print(f"❌ Error: {e}")
 
+# ============================================================================
+# BATCH MODE
+# ============================================================================
+
+def evaluate_line(calc, line, sequential=True):
+    """Evaluate one batch line and return its output text.
+    
+    Sequential lines share state like the interactive CLI: ans is the last
+    result, 'x = expr' assigns, and ms/m+/m-/mc/mr update or show memory
+    (their argument may be any expression). History is not recorded.
+    In parallel mode every line stands alone, so lines that read or change
+    that state are errors rather than order-dependent results.
+    """
+    command = line.lower().split()[0]
+    assignment = CalculatorCLI.ASSIGNMENT.match(line)
+    is_memory = command in CalculatorCLI.MEMORY_COMMANDS
+    
+    if not sequential:
+        if assignment or is_memory or calc.compile(line).stateful:
+            raise InvalidOperationError("Batch", "ans, mem, assignments and memory commands need --workers 1")
+        return str(calc.evaluate(line))
+    
+    if assignment:
+        return str(calc.assign(*assignment.groups()))
+    if is_memory:
+        mem = calc.memory
+        argument = line[len(command):].strip()
+        if command in ('ms', 'm+', 'm-'):
+            if not argument:
+                raise InvalidOperationError(command, "Value required")
+            value = calc.evaluate(argument)
+            {'ms': mem.store, 'm+': mem.add, 'm-': mem.subtract}[command](value)
+        elif command == 'mc':
+            mem.clear()
+        return str(mem.recall())
+    return str(calc.evaluate_expression(line))
+
+def _evaluate_chunk(lines, backend):
+    """Process pool worker: evaluate independent lines on a fresh calculator"""
+    Number.set_backend(backend)
+    calc = Calculator()
+    calc.record_history = False
+    results = []
+    for line in lines:
+        try:
+            results.append((True, evaluate_line(calc, line, sequential=False)))
+        except CalculatorError as e:
+            results.append((False, str(e)))
+    return results
+
+class CalculatorBatch:
+    """Non-interactive mode: stream expressions in, one result line out per expression.
+    
+    Blank lines and lines starting with '#' are skipped. Errors are written
+    as 'error: <message>' in place of the result, so output lines stay
+    aligned with input expressions. With workers > 1, chunks are evaluated
+    in a process pool and written back in input order.
+    """
+    
+    def __init__(self, workers=1, chunk_size=1000):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.calc = Calculator()
+        self.calc.record_history = False
+        self.count = 0
+        self.errors = 0
+    
+    @staticmethod
+    def read(source):
+        for line in source:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    
+    def _write(self, out, ok, text):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+            text = f"error: {text}"
+        out.write(text + '\n')
+    
+    def run(self, source, out):
+        """Evaluate every expression from source (an iterable of lines) into out"""
+        lines = self.read(source)
+        if self.workers <= 1:
+            for line in lines:
+                try:
+                    self._write(out, True, evaluate_line(self.calc, line))
+                except CalculatorError as e:
+                    self._write(out, False, str(e))
+            return
+        
+        # Keep a bounded window of chunks in flight, so input is still
+        # streamed and results come back in order
+        chunks = iter(lambda: list(islice(lines, self.chunk_size)), [])
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in chunks:
+                pending.append(pool.submit(_evaluate_chunk, chunk, Number.backend.name))
+                if len(pending) >= self.workers * 2:
+                    for ok, text in pending.popleft().result():
+                        self._write(out, ok, text)
+            while pending:
+                for ok, text in pending.popleft().result():
+                    self._write(out, ok, text)
+    
+    def run_file(self, path, out=None):
+        """Run a file ('-' for stdin) and report throughput on stderr"""
+        out = out or sys.stdout
+        start = time.perf_counter()
+        if path == '-':
+            self.run(sys.stdin, out)
+        else:
+            with open(path, encoding='utf-8') as source:
+                self.run(source, out)
+        out.flush()
+        elapsed = time.perf_counter() - start
+        rate = self.count / elapsed if elapsed else 0
+        print(f"✅ {self.count:,} expressions ({self.errors:,} errors) in {elapsed:.2f}s - "
+              f"{rate:,.0f} expr/s", file=sys.stderr)
+
 # ============================================================================
 # DEMO
 # ============================================================================
@@ -748,14 +1510,164 @@ def demo():
     print("✅ Demo complete!")
     print("=" * 60)
 
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def benchmark_parser(sizes=(1_000, 10_000, 100_000)):
+    """Show that parsing and evaluation time grows linearly with expression length"""
+    print("\n⏱️  EXPRESSION LENGTH SCALING")
+    print(f"  {'Terms':>9} {'Characters':>11} {'Flat':>10} {'Nested':>10} {'Per term':>10}")
+    
+    calc = Calculator()
+    for size in sizes:
+        # A long flat chain, and functions nested as deep as the recursion limit allows
+        flat = ' + '.join(f"{i % 97} * 2 - sqrt({i % 89})" for i in range(size))
+        depth = min(size, 200)
+        nested = 'sin(cos(' * (depth // 2) + '1' + '))' * (depth // 2)
+        nested = ' + '.join([nested] * (size // depth))
+        
+        timings = []
+        for expr in (flat, nested):
+            start = time.perf_counter()
+            calc.evaluate_expression(expr)
+            timings.append(time.perf_counter() - start)
+        print(f"  {size:>9,} {len(flat):>11,} {timings[0] * 1000:>8.1f}ms {timings[1] * 1000:>8.1f}ms "
+              f"{timings[0] / size * 1e6:>8.2f}µs")
+
+def benchmark_cache(evaluations=100_000, templates=50):
+    """Compare re-parsing every expression against the compiled-expression cache"""
+    print(f"\n⏱️  EXPRESSION CACHE ({evaluations:,} evaluations of {templates} templates)")
+    exprs = [f"sqrt({i} + ans % 7) * sin({i}) ^ 2 - log(mem + {i + 1})" for i in range(templates)]
+    
+    for label, cache_size in (("No cache", 0), ("LRU cache", templates)):
+        calc = Calculator(cache_size=cache_size)
+        calc.memory.store(10)
+        start = time.perf_counter()
+        for i in range(evaluations):
+            calc.evaluate_expression(exprs[i % templates])
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<10} {elapsed * 1000:>9.1f}ms  {evaluations / elapsed:>10,.0f} expr/s  "
+              f"hit rate {calc.cache.stats()['hit_rate']:.1%}")
+
+def benchmark_columns(rows=1_000_000):
+    """Compare a per-row evaluate_expression loop against evaluate_many"""
+    global np
+    print(f"\n⏱️  sqrt(x^2 + y^2) OVER {rows:,} ROWS")
+    xs = [float(i % 1000) for i in range(rows)]
+    ys = [float(i % 777) for i in range(rows)]
+    calc = Calculator()
+    expr = "sqrt(x^2 + y^2)"
+    
+    # The row loop is timed on a slice and scaled up
+    sample = min(rows, 20_000)
+    start = time.perf_counter()
+    for i in range(sample):
+        calc.evaluate_expression(expr, x=xs[i], y=ys[i])
+    loop = (time.perf_counter() - start) * rows / sample
+    print(f"  {'Row loop':<14} {loop * 1000:>10.1f}ms  (estimated from {sample:,} rows)")
+    
+    numpy = np
+    try:
+        np = None
+        start = time.perf_counter()
+        calc.evaluate_many(expr, x=xs, y=ys)
+        elapsed = time.perf_counter() - start
+        print(f"  {'Pure Python':<14} {elapsed * 1000:>10.1f}ms  {loop / elapsed:>6.1f}x")
+    finally:
+        np = numpy
+    
+    if np is None:
+        print("  NumPy          not installed")
+        return
+    start = time.perf_counter()
+    calc.evaluate_many(expr, x=xs, y=ys)
+    elapsed = time.perf_counter() - start
+    print(f"  {'NumPy':<14} {elapsed * 1000:>10.1f}ms  {loop / elapsed:>6.1f}x")
+
+def benchmark_numbers(iterations=100_000):
+    """Microbenchmarks: Number operators and Operation.execute, per backend"""
+    print(f"\n⏱️  NUMBER MICROBENCHMARKS (ns per call, best of 3 x {iterations:,})")
+    calc = Calculator()
+    operations = {}
+    for op in list(calc.BINARY_OPS.values()) + list(calc.UNARY_OPS.values()):
+        operations.setdefault(type(op).__name__, op)
+    
+    previous = Number.backend.name
+    columns = {}
+    try:
+        for backend in Number.BACKENDS:
+            Number.set_backend(backend)
+            a, b = Number(7.5), Number(2.25)
+            cases = {
+                'Number(x)': lambda: Number(3.5),
+                'a + b': lambda: a + b,
+                'a - b': lambda: a - b,
+                'a * b': lambda: a * b,
+                'a / b': lambda: a / b,
+                'a ** b': lambda: a ** b,
+                'a % b': lambda: a % b,
+                '-a': lambda: -a,
+                'a < b': lambda: a < b,
+                'a + 1': lambda: a + 1,
+                '1 + a': lambda: 1 + a,
+            }
+            for name, op in operations.items():
+                args = (a, b) if op.arity == 2 else (Number(5),)
+                cases[f"{name}.execute"] = lambda op=op, args=args: op.execute(*args)
+            
+            columns[backend] = {name: min(timeit.repeat(case, number=iterations, repeat=3)) / iterations * 1e9
+                                for name, case in cases.items()}
+    finally:
+        Number.set_backend(previous)
+    
+    print(f"  {'':<22}" + ''.join(f"{backend:>11}" for backend in columns))
+    for name in columns['float']:
+        print(f"  {name:<22}" + ''.join(f"{timings[name]:>11,.0f}" for timings in columns.values()))
+
+def benchmarks():
+    """Pick and run a benchmark"""
+    options = {
+        '1': ('Expression length scaling', benchmark_parser),
+        '2': ('Compiled expression cache', benchmark_cache),
+        '3': ('Vectorized column evaluation', benchmark_columns),
+        '4': ('Number and Operation microbenchmarks', benchmark_numbers),
+    }
+    print("\n⏱️  BENCHMARKS")
+    for key, (desc, _) in options.items():
+        print(f"  {key}. {desc}")
+    choice = input("\nChoice: ").strip()
+    if choice not in options:
+        print("\n❌ Invalid choice")
+        return
+    _, bench = options[choice]
+    bench()
+
 # Run
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scientific calculator")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="evaluate expressions from FILE, one per line ('-' for stdin)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes for --batch; lines must then be independent (default: 1)")
+    parser.add_argument('--backend', choices=list(Number.BACKENDS), default='float',
+                        help="number representation (default: float)")
+    args = parser.parse_args()
+    Number.set_backend(args.backend)
+    
+    if args.batch:
+        CalculatorBatch(workers=args.workers).run_file(args.batch)
+        sys.exit(0)
+    
     print("\n1. Run Demo")
     print("2. Run Interactive Calculator")
-    choice = input("\nChoice (1/2): ").strip()
+    print("3. Run Benchmarks")
+    choice = input("\nChoice (1/2/3): ").strip()
     
     if choice == "2":
         cli = CalculatorCLI()
         cli.run()
+    elif choice == "3":
+        benchmarks()
     else:
         demo()